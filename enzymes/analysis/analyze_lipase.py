@@ -1,11 +1,24 @@
 import pandas as pd
 import numpy as np
+import matplotlib
 import matplotlib.pyplot as plt
 import os
 import csv
-from io import StringIO
-from scipy import stats
-import itertools
+import glob
+import hashlib
+import json
+import platform
+import sys
+from datetime import datetime
+from scipy import stats, special
+from scipy.integrate import trapezoid
+from concurrent.futures import ProcessPoolExecutor
+
+# Helpers shared with the other analyses, in labtools/ at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from labtools.bundle import write_bundle
+from labtools.profiling import StageProfiler
+from labtools.workbook import file_hash, load_cached
 
 """
 Analysis script for Lipase experiment data.
@@ -17,12 +30,95 @@ Analysis script for Lipase experiment data.
 # Paths to data files (adjust if needed)
 LIPASE_CSV = os.path.join('..', 'data', 'UE_Sonstiges_Ergebnisse-Lipase.csv')
 TN_LIST_CSV = os.path.join('..', 'data', 'UE_Sonstiges_Ergebnisse-TN-Liste.csv')
+# Master workbook the CSVs are exported from, and the sheets read with --workbook
+WORKBOOK_XLSX = os.path.join('..', 'data', 'UE_Sonstiges_Ergebnisse.xlsx')
+LIPASE_SHEET = 'Lipase'
+TN_LIST_SHEET = 'TN-Liste'
 PLOTS_DIR = 'plots'
 OUT_DIR = 'out'
+CACHE_DIR = 'cache'
+MANIFEST_PATH = os.path.join(CACHE_DIR, 'manifest.json')
+
+# Single-file results bundle (--bundle)
+BUNDLE_PATH = os.path.join(OUT_DIR, 'results.parquet')
+
+# Spacing (min) of the shared time grid the pH curves are resampled onto
+TIME_GRID_STEP = 1.0
+
+# Bump whenever a loader changes its output, so cached frames are rebuilt
+PARSER_VERSION = 3
+
+
+GESCHLECHT_CODES = {'w': 'female', 'm': 'male', 'd': 'diverse', 'wm': 'female/male'}
+RAUCHER_CODES = {
+    '1': 'Nichtraucher',
+    'n': 'Nichtraucher',
+    '0': 'Nichtraucher',
+    '2': 'Gelegenheitsraucher',
+    '3': 'Raucher',
+    'j': 'Raucher',
+    '4': 'Starker Raucher (>= 1 Packung/Tag)',
+    '3-4': 'Raucher/Starker Raucher',
+    'jn': 'Raucher/Nichtraucher',
+    '1/2': 'Nichtraucher/Gelegenheitsraucher'
+}
+SPORTLER_CODES = {
+    '1': 'Kein Sport',
+    '0': 'Kein Sport',
+    '2': 'Gelegentlich',
+    '3': 'Mindestens 1x pro Woche',
+    '4': 'Beinahe täglich'
+}
+BRILLENTRAEGER_CODES = {'j': 'Ja', 'n': 'Nein'}
+
+
+def decode_categorical(col, codes, missing=None):
+    """Decodes a code column into a categorical in one mapping step.
+
+    Only the unique values are looked up in `codes`; values without an entry
+    are kept as they are. Missing values become `missing`, if given.
+    """
+    positions, uniques = pd.factorize(col)
+    labels = [codes.get(value, value) for value in uniques]
+    if missing is not None:
+        labels.append(missing)
+        positions = np.where(positions < 0, len(labels) - 1, positions)
+
+    categories = list(dict.fromkeys(labels))
+    category_index = {label: i for i, label in enumerate(categories)}
+    # The trailing -1 keeps factorize's missing marker (-1) missing
+    remap = np.array([category_index[label] for label in labels] + [-1])
+    return pd.Categorical.from_codes(remap[positions], categories=categories)
+
+
+def downcast_integer(col):
+    """Downcasts an integer-valued column to the smallest integer type.
+
+    Columns with missing values get the matching nullable type (e.g. Int8).
+    """
+    dtype = pd.to_numeric(col.dropna(), downcast='integer').dtype
+    if col.isna().any() and dtype.kind == 'i':
+        return col.astype(str(dtype).capitalize())
+    return col.astype(dtype)
+
+
+def memory_report(df):
+    """Returns the dtype and deep memory usage (bytes) of every column, plus the total."""
+    usage = df.memory_usage(deep=True, index=True)
+    report = pd.DataFrame({
+        'dtype': [str(df.index.dtype)] + [str(dtype) for dtype in df.dtypes],
+        'bytes': usage.to_numpy(),
+    }, index=usage.index)
+    report.loc['Total'] = ['', usage.sum()]
+    return report
 
 
 def load_clean_participant_list(path):
-    """Load and clean the participant list CSV."""
+    """Load and clean the participant list CSV.
+
+    The code columns are decoded straight into categoricals, and Alter and
+    Nummer are stored in the smallest integer types.
+    """
     df = pd.read_csv(path, sep=',', encoding='utf-8', decimal=',', header=0)
     df.columns = [
         'Datum', 'Stdgang', 'Nummer', 'Gruppe', 'Alter', 'Geschlecht', 'Raucher',
@@ -32,94 +128,97 @@ def load_clean_participant_list(path):
     df['Datum'] = pd.to_datetime(df['Datum'], format='%d.%m.%Y', errors='coerce').ffill()
     df['Stdgang'] = df['Stdgang'].ffill()
 
-    # Clean 'Geschlecht'
-    df['Geschlecht'] = df['Geschlecht'].replace({'w': 'female', 'm': 'male', 'd': 'diverse', 'wm': 'female/male'})
-
-    # Clean 'Raucher'
-    df['Raucher'] = df['Raucher'].replace({
-        '1': 'Nichtraucher',
-        'n': 'Nichtraucher',
-        '0': 'Nichtraucher',
-        '2': 'Gelegenheitsraucher',
-        '3': 'Raucher',
-        'j': 'Raucher',
-        '4': 'Starker Raucher (>= 1 Packung/Tag)',
-        '3-4': 'Raucher/Starker Raucher',
-        'jn': 'Raucher/Nichtraucher',
-        '1/2': 'Nichtraucher/Gelegenheitsraucher'
-    }).fillna('Unbekannt')
-
-    # Clean 'Sportler'
-    df['Sportler'] = df['Sportler'].replace({
-        '1': 'Kein Sport',
-        '0': 'Kein Sport',
-        '2': 'Gelegentlich',
-        '3': 'Mindestens 1x pro Woche',
-        '4': 'Beinahe täglich'
-    }).fillna('Unbekannt')
-    
-    # Clean 'Brillenträger'
-    df['Brillenträger'] = df['Brillenträger'].replace({
-        'j': 'Ja', 'n': 'Nein'
-    }).fillna('Unbekannt')
-
     df['Alter'] = pd.to_numeric(df['Alter'], errors='coerce')
     df = df.dropna(subset=['Alter'])
-    df['Alter'] = df['Alter'].astype(int)
+    df['Alter'] = downcast_integer(df['Alter'])
+    df['Nummer'] = downcast_integer(df['Nummer'])
+
+    df['Stdgang'] = df['Stdgang'].astype('category')
+    df['Gruppe'] = df['Gruppe'].astype('category')
+    df['Geschlecht'] = decode_categorical(df['Geschlecht'], GESCHLECHT_CODES)
+    df['Raucher'] = decode_categorical(df['Raucher'], RAUCHER_CODES, missing='Unbekannt')
+    df['Sportler'] = decode_categorical(df['Sportler'], SPORTLER_CODES, missing='Unbekannt')
+    df['Brillenträger'] = decode_categorical(df['Brillenträger'], BRILLENTRAEGER_CODES, missing='Unbekannt')
 
     return df
 
 
-def load_clean_lipase_results(path):
-    """Load and parse the block-structured Lipase results CSV into tidy format."""
-    with open(path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
+def _to_float(col):
+    """Converts a column of German decimal strings ("9,8", "-", "") to floats."""
+    col = col.astype(str).str.replace(',', '.')
+    col = col.where(~col.isin(['', ' ', '-']))
+    try:
+        # Fast path for clean columns, anything else is coerced to NaN below
+        return col.astype('float64')
+    except ValueError:
+        return pd.to_numeric(col, errors='coerce')
 
-    header = [h.strip() for h in lines[0].strip().split(',')]
-    data = []
-    current_meta = {}
 
-    for line in lines[1:]:
-        line = line.strip()
-        if not line:
-            continue
-        
-        # Use csv.reader to split line, respecting quotes
-        reader = csv.reader(StringIO(line), delimiter=',', quotechar='"')
-        values = next(reader)
-        values = [v.strip().strip('"') for v in values]
-
-        # A line is meta if it has a value in 'Datum' or 'Stdgang' column
-        is_meta = bool(values[0] or values[1])
-
-        if is_meta:
-            # Update current_meta, forward filling from previous meta
-            line_meta = dict(zip(header, values))
-            for k, v in line_meta.items():
-                current_meta[k] = v
-            
-            # A meta line can contain the first measurement
-            if line_meta.get('gekocht') or line_meta.get('ungekocht'):
-                data.append(current_meta.copy())
-        else:
-            # It's a measurement line. Values are in fixed columns relative to the header.
-            zeit_idx = header.index('Zeit')
-            
-            # Check if there's a time value present at the expected position
-            if len(values) > zeit_idx and values[zeit_idx]:
-                measurement_row = current_meta.copy()
-                measurement_row['Zeit'] = values[zeit_idx]
-                measurement_row['gekocht'] = values[zeit_idx + 1] if len(values) > zeit_idx + 1 else ''
-                measurement_row['ungekocht'] = values[zeit_idx + 2] if len(values) > zeit_idx + 2 else ''
-                data.append(measurement_row)
-
-    df = pd.DataFrame(data)
+def _tidy_lipase_chunk(raw, header, carry=None):
+    """Turns a chunk of raw CSV lines into measurement rows.
+
+    Meta lines (with a value in 'Datum' or 'Stdgang') open a new block; their
+    values are forward-filled column-wise onto the following measurement lines.
+    `carry` is the last meta state of the previous chunk, so blocks spanning a
+    chunk boundary are filled correctly. Returns the rows and the new carry.
+    """
+    raw = raw.apply(lambda col: col.str.strip().str.strip('"'))
+
+    is_meta = (raw[header[0]] != '') | (raw[header[1]] != '')
+    meta = raw.where(is_meta, axis=0)
+    if carry is not None and len(meta):
+        meta.iloc[0] = meta.iloc[0].fillna(carry)
+    meta = meta.ffill()
+
+    # A meta line can contain the first measurement, all other lines only
+    # carry values in the fixed Zeit/gekocht/ungekocht columns
+    has_sample = is_meta & ((raw['gekocht'] != '') | (raw['ungekocht'] != ''))
+    has_time = ~is_meta & (raw['Zeit'] != '')
+
+    rows = meta.copy()
+    for col in ['Zeit', 'gekocht', 'ungekocht']:
+        rows[col] = rows[col].where(is_meta, raw[col])
+
+    new_carry = meta.iloc[-1] if len(meta) else carry
+    return rows[has_sample | has_time], new_carry
+
+
+def load_clean_lipase_results(path, chunksize=None):
+    """Load and parse the block-structured Lipase results CSV into tidy format.
+
+    The file is read in one bulk pass, or in chunks of `chunksize` lines for
+    very large exports, and the block metadata is forward-filled column-wise.
+    """
+    # `path` can also be a text buffer, e.g. a sheet from read_workbook_sheet
+    if hasattr(path, 'read'):
+        header_line = path.readline()
+        path.seek(0)
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            header_line = f.readline()
+    header = [h.strip() for h in header_line.strip().split(',')]
+
+    read_kwargs = dict(
+        sep=',', quotechar='"', encoding='utf-8', header=0, names=header,
+        usecols=range(len(header)), dtype=str, keep_default_na=False
+    )
+    if chunksize:
+        chunks = []
+        carry = None
+        with pd.read_csv(path, chunksize=chunksize, **read_kwargs) as reader:
+            for raw in reader:
+                rows, carry = _tidy_lipase_chunk(raw, header, carry)
+                chunks.append(rows)
+        df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+    else:
+        df, _ = _tidy_lipase_chunk(pd.read_csv(path, **read_kwargs), header)
+        df = df.reset_index(drop=True)
 
     if df.empty:
-        return df
+        return pd.DataFrame()
 
-    # Clean and type-cast columns
-    df['Datum'] = pd.to_datetime(df['Datum'], dayfirst=True, errors='coerce')
+    # Clean and type-cast columns; the export mixes dd.mm.yyyy and d/m/yyyy dates
+    df['Datum'] = pd.to_datetime(df['Datum'], format='mixed', dayfirst=True, errors='coerce')
     
     # Forward fill essential metadata
     for col in ['Datum', 'Stdgang', 'Gruppe', 'Menge']:
@@ -129,8 +228,7 @@ def load_clean_lipase_results(path):
     df.rename(columns={'gekocht': 'pH_gekocht', 'ungekocht': 'pH_ungekocht'}, inplace=True)
 
     for col in ['Zeit', 'pH_gekocht', 'pH_ungekocht']:
-        df[col] = df[col].astype(str).str.replace(',', '.').replace('-', np.nan).replace(' ', '')
-        df[col] = pd.to_numeric(df[col], errors='coerce')
+        df[col] = _to_float(df[col])
         
     df = df.dropna(subset=['Zeit'])
     df = df.dropna(subset=['pH_gekocht', 'pH_ungekocht'], how='all')
@@ -138,34 +236,498 @@ def load_clean_lipase_results(path):
     return df
 
 
-def calculate_ph_drop(df):
-    """Calculates the pH drop for each experimental group."""
-    # Ensure Zeit is sorted within each group
-    df = df.sort_values(by=['Stdgang', 'Gruppe', 'Zeit'])
+def clear_cache():
+    """Removes all cached frames and the output manifest."""
+    for cache_path in glob.glob(os.path.join(CACHE_DIR, '*.parquet')) + glob.glob(MANIFEST_PATH):
+        os.remove(cache_path)
 
-    # Get initial and final measurements for each group
-    initial_ph = df.loc[df.groupby(['Stdgang', 'Gruppe'])['Zeit'].idxmin()]
-    final_ph = df.loc[df.groupby(['Stdgang', 'Gruppe'])['Zeit'].idxmax()]
 
-    # Merge to get initial and final on the same row
-    merged = pd.merge(
-        initial_ph, final_ph,
-        on=['Stdgang', 'Gruppe', 'Menge', 'Datum', 'Sonstiges'],
-        suffixes=('_initial', '_final')
-    )
+def load_manifest():
+    """Loads the manifest mapping each output file to the digest it was built from."""
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest):
+    """Saves the output manifest."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(MANIFEST_PATH, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def job_digest(func, args, kwargs):
+    """Hashes a job's function, the code it can call, the library versions and its inputs.
+
+    The source file of the function's module stands in for its code, so editing
+    any helper the job calls also outdates its outputs, as does upgrading one
+    of the libraries that compute or draw them.
+    """
+    digest = hashlib.sha256(func.__name__.encode())
+    digest.update(file_hash(sys.modules[func.__module__].__file__).encode())
+    digest.update(repr(library_versions()).encode())
+    _update_digest(digest, (args, sorted(kwargs.items())))
+    return digest.hexdigest()
+
+
+def library_versions():
+    """Returns the versions of the libraries the outputs are computed and drawn with."""
+    import scipy
+    return {'numpy': np.__version__, 'pandas': pd.__version__, 'scipy': scipy.__version__,
+            'matplotlib': matplotlib.__version__}
+
+
+def _update_digest(digest, value):
+    """Feeds a job argument into `digest`, hashing DataFrames and arrays by content."""
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr(list(value.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(repr((value.dtype, value.shape)).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        _update_digest(digest, list(value.items()))
+    elif isinstance(value, (list, tuple)):
+        digest.update(f'{type(value).__name__}{len(value)}'.encode())
+        for item in value:
+            _update_digest(digest, item)
+    else:
+        digest.update(repr(value).encode())
+
+
+def outdated_jobs(jobs, manifest, force=False):
+    """Filters (outputs, function, args, kwargs) jobs down to the ones that need to run.
+
+    A job is outdated if one of its outputs is missing or was built from other
+    inputs than the current ones. The new digests are recorded in `manifest`,
+    which should only be saved once the returned jobs have run.
+    """
+    outdated = []
+    for job in jobs:
+        outputs, func, args, kwargs = job
+        digest = job_digest(func, args, kwargs)
+        if force or any(manifest.get(path) != digest or not os.path.exists(path) for path in outputs):
+            outdated.append(job)
+            manifest.update({path: digest for path in outputs})
+    return outdated
+
+
+def save_bundle(tn_df, lipase_df, workbook=None, **parameters):
+    """Collects all results in one file at BUNDLE_PATH.
+
+    The bundle holds every statistics CSV in OUT_DIR (kind 'table', named
+    after the file), the cleaned participant and lipase data ('data'), every
+    plot in PLOTS_DIR ('file') and the run metadata with the sources (the
+    CSVs, or the sheets of `workbook`) and the analysis `parameters`; see
+    labtools.bundle.read_bundle. The tables are read back from OUT_DIR since
+    up-to-date ones are not recomputed. Returns False if pyarrow is not
+    installed.
+    """
+    entries = []
+    for path in sorted(glob.glob(os.path.join(OUT_DIR, '*.csv'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            has_index = f.readline().startswith(',')
+        table = pd.read_csv(path, index_col=0 if has_index else None)
+        entries.append((os.path.splitext(os.path.basename(path))[0], 'table', table))
+    entries += [('participants', 'data', tn_df), ('lipase', 'data', lipase_df)]
+    entries += [(os.path.basename(path), 'file', path) for path in sorted(glob.glob(os.path.join(PLOTS_DIR, '*.png')))]
+
+    metadata = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'script': 'analyze_lipase.py',
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'sources': ({'participants': f"{workbook}:{TN_LIST_SHEET}", 'lipase': f"{workbook}:{LIPASE_SHEET}"}
+                    if workbook else {'participants': TN_LIST_CSV, 'lipase': LIPASE_CSV}),
+        'rows': len(lipase_df),
+        'groups': int(lipase_df.groupby(GROUP_KEYS).ngroups),
+        'parameters': parameters,
+    }
+    try:
+        write_bundle(BUNDLE_PATH, entries, metadata)
+    except ImportError:
+        print("No Parquet engine installed (pyarrow), skipping the results bundle.")
+        return False
+    print(f"Results bundle saved to '{BUNDLE_PATH}'")
+    return True
+
+
+GROUP_KEYS = ['Stdgang', 'Gruppe']
+BLOCK_META = ['Datum', 'Menge', 'Sonstiges']
+CONDITIONS = ['gekocht', 'ungekocht']
+
+
+def _sorted_groups(df):
+    """Sorts the rows by group and time.
+
+    Returns the sorted frame, the group number of every row and the first row
+    of every group.
+    """
+    df = df.dropna(subset=GROUP_KEYS).sort_values(by=GROUP_KEYS + ['Zeit'], kind='stable')
+    codes = df.groupby(GROUP_KEYS, sort=True).ngroup().to_numpy()
+    starts = np.flatnonzero(np.diff(codes, prepend=-1))
+    return df, codes, starts
+
+
+def _condition_features(t, y, codes, starts, first, last):
+    """Computes the kinetic features of one condition for all groups at once.
+
+    `t` and `y` are the time and pH arrays sorted by group and time, `codes` the
+    group number of every row, `starts` the first row of every group, `first`
+    and `last` the rows holding the minimum and maximum time of every group.
+    Rates and slopes are pH drops per minute, so acidification is positive.
+    """
+    n = len(t)
+    ph_initial = y[first]
+    ph_final = y[last]
+    drop = ph_initial - ph_final
+
+    # Drop rate on every interval between consecutive measurements of a group
+    same_group = np.append(codes[1:] == codes[:-1], False)
+    next_idx = np.minimum(np.arange(n) + 1, n - 1)
+    dt = t[next_idx] - t
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.where(same_group & (dt > 0), (y - y[next_idx]) / dt, np.nan)
+    initial_rate = slope[starts]
+    max_slope = np.fmax.reduceat(slope, starts)
+
+    # Trapezoidal area under the pH curve, skipping intervals with missing pH
+    area = np.where(same_group, (y + y[next_idx]) / 2 * dt, np.nan)
+    auc = np.add.reduceat(np.nan_to_num(area), starts)
+
+    # First time the curve reaches half of the total drop, linearly interpolated
+    target = (ph_initial - drop / 2)[codes]
+    reached = np.where(y <= target, np.arange(n), n)
+    hit = np.minimum.reduceat(reached, starts)
+    valid = (drop > 0) & (hit < n)
+    hit = np.where(valid, hit, 1)
+    prev = hit - 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frac = (y[prev] - target[hit]) / (y[prev] - y[hit])
+    t_half = np.where(np.isnan(frac), t[hit], t[prev] + frac * (t[hit] - t[prev]))
+    t_half = np.where(valid, t_half, np.nan)
+
+    return {
+        'pH_initial': ph_initial,
+        'pH_final': ph_final,
+        'drop': drop,
+        'initial_rate': initial_rate,
+        't_half': t_half,
+        'auc': auc,
+        'max_slope': max_slope,
+    }
+
+
+def extract_kinetic_features(df):
+    """Extracts kinetic features of every (Stdgang, Gruppe) group and condition.
+
+    The data is sorted once by group and time; all features are then computed
+    for all groups from the group boundaries, without per-feature groupbys or
+    merges. Per condition the table holds initial/final pH, total drop,
+    initial and maximum drop rate (pH/min), time to half of the total drop
+    (min) and the area under the pH curve (pH*min).
+    """
+    df, codes, starts = _sorted_groups(df)
+    if df.empty:
+        return pd.DataFrame(columns=GROUP_KEYS + BLOCK_META + ['consistent'])
+
+    n = len(codes)
+    ends = np.append(starts[1:], n) - 1
+
+    t = df['Zeit'].to_numpy(dtype=float)
+    # Like idxmax, the final measurement is the first row holding the maximum time
+    first = starts
+    last = np.minimum.reduceat(np.where(t == t[ends][codes], np.arange(n), n), starts)
+
+    head = df.iloc[first][GROUP_KEYS + BLOCK_META].reset_index(drop=True)
+    tail = df.iloc[last][BLOCK_META].reset_index(drop=True)
+    features = head.copy()
+    # Groups spanning several blocks disagree on their metadata at both ends
+    features['consistent'] = ((head[BLOCK_META] == tail) | (head[BLOCK_META].isna() & tail.isna())).all(axis=1)
+    for condition in CONDITIONS:
+        y = df[f'pH_{condition}'].to_numpy(dtype=float)
+        for name, values in _condition_features(t, y, codes, starts, first, last).items():
+            features[f'{name}_{condition}'] = values
+
+    return features
+
+
+def calculate_ph_drop(df, features=None):
+    """Calculates the pH drop for each experimental group.
+
+    Precomputed `features` from extract_kinetic_features can be passed to skip
+    the extraction. Groups whose first and last measurement belong to blocks
+    with different metadata are left out.
+    """
+    if features is None:
+        features = extract_kinetic_features(df)
+    features = features[features['consistent']].reset_index(drop=True)
+    return features[['Stdgang', 'Gruppe', 'Menge', 'drop_gekocht', 'drop_ungekocht']]
+
+
+def _decay_profile(log_k, t, y, w):
+    """Fits y = plateau + amplitude * exp(-k * t) for given rate constants.
+
+    For a fixed k the model is linear in plateau and amplitude, so both are
+    solved in closed form for every curve (row) at once. Returns the residual
+    sum of squares, plateau and amplitude per curve.
+    """
+    e = np.exp(-np.exp(log_k)[:, None] * t)
+    s1 = w.sum(axis=1)
+    se = (w * e).sum(axis=1)
+    see = (w * e * e).sum(axis=1)
+    sy = (w * y).sum(axis=1)
+    sey = (w * e * y).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        amplitude = (s1 * sey - se * sy) / (s1 * see - se ** 2)
+        plateau = (sy - amplitude * se) / s1
+    sse = (w * (y - plateau[:, None] - amplitude[:, None] * e) ** 2).sum(axis=1)
+    return np.where(np.isfinite(sse), sse, np.inf), plateau, amplitude
+
+
+def fit_decay_batch(t, y, grid_size=41, refine_steps=40):
+    """Fits an exponential approach to a plateau to every row of padded arrays.
+
+    `t` and `y` have shape (curves, points) and are padded with NaN. The rate
+    constant is located on a log grid scaled to each curve's time span and
+    then refined by a golden-section search, both vectorized over all curves;
+    plateau and amplitude are profiled out in closed form. Curves with fewer
+    than three points are left as NaN; fits whose rate constant hit the edge
+    of the search range are flagged in `at_bound`.
+    """
+    w = (~np.isnan(t) & ~np.isnan(y)).astype(float)
+    n = w.sum(axis=1)
+    t0 = np.nanmin(np.where(w > 0, t, np.nan), axis=1, initial=np.inf)
+    span = np.nanmax(np.where(w > 0, t, np.nan), axis=1, initial=-np.inf) - t0
+    span = np.where(np.isfinite(span) & (span > 0), span, 1.0)
+    t = np.where(w > 0, t - t0[:, None], 0.0)
+    y = np.where(w > 0, y, 0.0)
+
+    # Coarse search: rate constants from 1/100 to 100 decays per time span
+    grid = np.linspace(np.log(1e-2), np.log(1e2), grid_size)
+    log_span = np.log(span)
+    sse = np.stack([_decay_profile(g - log_span, t, y, w)[0] for g in grid])
+    best = np.argmin(sse, axis=0)
+
+    # Golden-section refinement between the neighbouring grid points
+    ratio = (np.sqrt(5) - 1) / 2
+    lo = grid[np.maximum(best - 1, 0)] - log_span
+    hi = grid[np.minimum(best + 1, grid_size - 1)] - log_span
+    a = hi - ratio * (hi - lo)
+    b = lo + ratio * (hi - lo)
+    sse_a = _decay_profile(a, t, y, w)[0]
+    sse_b = _decay_profile(b, t, y, w)[0]
+    for _ in range(refine_steps):
+        left = sse_a < sse_b
+        hi = np.where(left, b, hi)
+        lo = np.where(left, lo, a)
+        a, b = np.where(left, hi - ratio * (hi - lo), b), np.where(left, a, lo + ratio * (hi - lo))
+        sse_new = _decay_profile(np.where(left, a, b), t, y, w)[0]
+        sse_a, sse_b = np.where(left, sse_new, sse_b), np.where(left, sse_a, sse_new)
+
+    log_k = (lo + hi) / 2
+    sse, plateau, amplitude = _decay_profile(log_k, t, y, w)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = (w * y).sum(axis=1) / n
+        sst = (w * (y - mean[:, None]) ** 2).sum(axis=1)
+        r_squared = 1 - sse / sst
+        rmse = np.sqrt(sse / n)
+
+    k = np.exp(log_k)
+    fitted = n >= 3
+    # Near-linear or step-like curves end up at the edge of the search range
+    at_bound = (np.abs(log_k + log_span - grid[0]) < 1e-6) | (np.abs(log_k + log_span - grid[-1]) < 1e-6)
+    result = {
+        'n': n.astype(int),
+        'k': k,
+        'half_life': np.log(2) / k,
+        'plateau': plateau,
+        'pH_start': plateau + amplitude,
+        'rmse': rmse,
+        'r_squared': r_squared,
+    }
+    result = {name: (values if name == 'n' else np.where(fitted, values, np.nan)) for name, values in result.items()}
+    result['at_bound'] = fitted & at_bound
+    return result
+
+
+def fit_decay_curves(df):
+    """Fits the exponential decay model to every (Stdgang, Gruppe, condition) curve.
+
+    All curves are stacked into padded (groups x time points) arrays and
+    fitted at once. Returns one row per curve with the rate constant k (1/min),
+    half-life (min), plateau and fitted start pH, RMSE, R^2 and whether the
+    rate constant hit the edge of the search range.
+    """
+    df, codes, starts = _sorted_groups(df)
+    if df.empty:
+        return pd.DataFrame(columns=GROUP_KEYS + ['Menge', 'condition'])
+
+    positions = np.arange(len(codes)) - starts[codes]
+    shape = (len(starts), positions.max() + 1)
+    t = np.full(shape, np.nan)
+    t[codes, positions] = df['Zeit'].to_numpy(dtype=float)
+
+    head = df.iloc[starts][GROUP_KEYS + ['Menge']].reset_index(drop=True)
+    fits = []
+    for condition in CONDITIONS:
+        y = np.full(shape, np.nan)
+        y[codes, positions] = df[f'pH_{condition}'].to_numpy(dtype=float)
+        condition_fits = head.assign(condition=condition, **fit_decay_batch(t, y))
+        fits.append(condition_fits)
+    return pd.concat(fits, ignore_index=True)
+
+
+def save_decay_fits(fits):
+    """Saves the decay model fits to CSV."""
+    if not os.path.exists(OUT_DIR):
+        os.makedirs(OUT_DIR)
+
+    output_path = os.path.join(OUT_DIR, 'kinetic_fits.csv')
+    fits.to_csv(output_path, index=False)
+    print(f"Decay model fits saved to '{output_path}'")
+
+
+def save_kinetic_features(features):
+    """Saves the kinetic feature table to CSV."""
+    if not os.path.exists(OUT_DIR):
+        os.makedirs(OUT_DIR)
+
+    output_path = os.path.join(OUT_DIR, 'kinetic_features.csv')
+    features.drop(columns='consistent').to_csv(output_path, index=False)
+    print(f"\nKinetic features saved to '{output_path}'")
 
-    # Calculate drop
-    merged['drop_gekocht'] = merged['pH_gekocht_initial'] - merged['pH_gekocht_final']
-    merged['drop_ungekocht'] = merged['pH_ungekocht_initial'] - merged['pH_ungekocht_final']
 
-    return merged[['Stdgang', 'Gruppe', 'Menge', 'drop_gekocht', 'drop_ungekocht']]
+def _pad_groups(groups):
+    """Stacks 1-D arrays of different lengths into a NaN-padded 2D array."""
+    sizes = np.array([len(group) for group in groups])
+    values = np.full((len(groups), max(sizes.max(initial=0), 1)), np.nan)
+    values[np.arange(values.shape[1]) < sizes[:, None]] = np.concatenate([np.asarray(g, dtype=float) for g in groups] or [[]])
+    return values, sizes
 
 
-def perform_descriptive_analysis(ph_drops):
-    """Calculates descriptive statistics and saves them to two separate CSV files."""
+def _masked_statistics(values, sizes):
+    """Mean and median over the last axis, ignoring the padding beyond `sizes`.
+
+    Returns an array with the statistics stacked along a new first axis.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.nansum(values, axis=-1) / sizes
+    ordered = np.sort(values, axis=-1)
+    lo = np.broadcast_to(np.maximum(sizes - 1, 0) // 2, ordered.shape[:-1])[..., None]
+    hi = np.broadcast_to(sizes // 2, ordered.shape[:-1])[..., None]
+    hi = np.minimum(hi, ordered.shape[-1] - 1)
+    median = (np.take_along_axis(ordered, lo, -1) + np.take_along_axis(ordered, hi, -1))[..., 0] / 2
+    return np.stack([mean, np.where(sizes > 0, median, np.nan)])
+
+
+def _bootstrap_chunk(values, sizes, n_resamples, seed):
+    """Draws `n_resamples` bootstrap samples of every group at once.
+
+    Returns the bootstrapped statistics, shaped (statistics, resamples, groups).
+    """
+    rng = np.random.default_rng(seed)
+    n_groups, width = values.shape
+    idx = (rng.random((n_resamples, n_groups, width)) * sizes[:, None]).astype(int)
+    samples = values[np.arange(n_groups)[None, :, None], idx]
+    samples = np.where(np.arange(width) < sizes[:, None], samples, np.nan)
+    return _masked_statistics(samples, sizes)
+
+
+def _jackknife_statistics(values, sizes):
+    """Leave-one-out mean and median of every group, shaped (statistics, groups, points)."""
+    n_groups, width = values.shape
+    inside = np.arange(width) < sizes[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        loo_mean = (np.nansum(values, axis=1)[:, None] - values) / (sizes[:, None] - 1)
+
+    # On sorted data, dropping rank r shifts every later element one place down
+    ordered = np.sort(values, axis=1)
+    m = sizes - 1
+    ranks = np.arange(width)
+    lo = np.maximum(m - 1, 0) // 2
+    hi = m // 2
+
+    def pick(k):
+        pos = k[:, None] + (k[:, None] >= ranks[None, :])
+        return np.take_along_axis(ordered, np.minimum(pos, width - 1), axis=1)
+
+    loo_median = (pick(lo) + pick(hi)) / 2
+    return np.where(inside, np.stack([loo_mean, loo_median]), np.nan)
+
+
+def bootstrap_ci(groups, n_resamples=10000, seed=0, confidence=0.95, method='bca', chunk_size=1000, workers=1):
+    """Bootstrap confidence intervals for the mean and median of several groups.
+
+    All groups are resampled together with NumPy index matrices, in chunks of
+    `chunk_size` resamples that can be spread across `workers` processes.
+    Every chunk gets its own child seed of `seed`, so the result does not
+    depend on the worker count. `method` is 'percentile' or 'bca' (bias-
+    corrected and accelerated); BCa falls back to the percentile interval for
+    groups where it is undefined, e.g. with a single value. Returns a dict
+    mapping 'mean' and 'median' to (low, high) arrays with one entry per group.
+    """
+    values, sizes = _pad_groups(groups)
+    n_chunks = -(-n_resamples // chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    chunk_sizes = [min(chunk_size, n_resamples - i * chunk_size) for i in range(n_chunks)]
+    chunk_args = [(values, sizes, size, chunk_seed) for size, chunk_seed in zip(chunk_sizes, seeds)]
+    if workers == 1 or n_chunks == 1:
+        chunks = [_bootstrap_chunk(*args) for args in chunk_args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            chunks = list(pool.map(_bootstrap_chunk, *zip(*chunk_args)))
+    boot = np.sort(np.concatenate(chunks, axis=1), axis=1)
+
+    alpha = (1 - confidence) / 2
+    levels = np.broadcast_to(np.array([alpha, 1 - alpha])[:, None, None], (2,) + boot[:, 0].shape)
+    if method == 'bca':
+        estimates = _masked_statistics(values, sizes)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Ties with the estimate count half, which matters for the median
+            below = (boot < estimates[:, None, :]).mean(axis=1) + (boot <= estimates[:, None, :]).mean(axis=1)
+            z0 = special.ndtri(below / 2)
+            jack = _jackknife_statistics(values, sizes)
+            jack_mean = np.nansum(jack, axis=-1, keepdims=True) / sizes[:, None]
+            deviation = jack_mean - jack
+            accel = np.nansum(deviation ** 3, axis=-1) / (6 * np.nansum(deviation ** 2, axis=-1) ** 1.5)
+            z = special.ndtri(np.array([alpha, 1 - alpha]))[:, None, None]
+            bca_levels = special.ndtr(z0 + (z0 + z) / (1 - accel * (z0 + z)))
+        levels = np.where(np.isfinite(bca_levels), bca_levels, levels)
+    elif method != 'percentile':
+        raise ValueError(f"Unknown bootstrap method '{method}'")
+
+    # Linear interpolation between order statistics, like np.quantile
+    position = levels * (boot.shape[1] - 1)
+    below = np.floor(position).astype(int)
+    above = np.minimum(below + 1, boot.shape[1] - 1)
+    low_values = np.take_along_axis(boot[None], below[:, :, None, :], axis=2)[:, :, 0]
+    high_values = np.take_along_axis(boot[None], above[:, :, None, :], axis=2)[:, :, 0]
+    bounds = low_values + (position - below) * (high_values - low_values)
+    return {name: (bounds[0, i], bounds[1, i]) for i, name in enumerate(['mean', 'median'])}
+
+
+def _ci_columns(groups, **bootstrap_kwargs):
+    """Bootstrap CI bounds of the mean and median as named columns."""
+    intervals = bootstrap_ci(groups, **bootstrap_kwargs)
+    return {f'{name}_ci_{side}': bounds[i]
+            for name, bounds in intervals.items() for i, side in enumerate(['low', 'high'])}
+
+
+def perform_descriptive_analysis(ph_drops, n_resamples=10000, seed=0, ci_method='bca', workers=1):
+    """Calculates descriptive statistics and saves them to separate CSV files.
+
+    Bootstrap confidence intervals (95%) for the mean and median drop, based on
+    `n_resamples` resamples drawn with `seed`, are added as columns to the
+    per-Menge table. The overall ones go to descriptive_statistics_overall_ci.csv,
+    since the protocol renders every row of the overall table.
+    """
     if not os.path.exists(OUT_DIR):
         os.makedirs(OUT_DIR)
 
+    bootstrap_kwargs = dict(n_resamples=n_resamples, seed=seed, method=ci_method, workers=workers)
+
     # 1. Overall descriptive statistics
     overall_desc = ph_drops[['drop_gekocht', 'drop_ungekocht']].describe()
     # Convert to object type to allow mixed types in columns, then set count to int
@@ -175,6 +737,12 @@ def perform_descriptive_analysis(ph_drops):
     overall_desc_formatted.to_csv(overall_output_path)
     print(f"\nOverall descriptive statistics saved to '{overall_output_path}'")
 
+    overall_groups = [ph_drops[col].dropna().to_numpy() for col in overall_desc.columns]
+    overall_ci = pd.DataFrame(_ci_columns(overall_groups, **bootstrap_kwargs), index=overall_desc.columns).T
+    overall_ci_path = os.path.join(OUT_DIR, 'descriptive_statistics_overall_ci.csv')
+    overall_ci.to_csv(overall_ci_path)
+    print(f"Overall confidence intervals saved to '{overall_ci_path}'")
+
     # 2. Descriptive statistics by 'Menge' in a tidy format
     ph_drops_cleaned = ph_drops.copy()
     ph_drops_cleaned['Menge'] = pd.to_numeric(ph_drops_cleaned['Menge'], errors='coerce')
@@ -189,12 +757,119 @@ def perform_descriptive_analysis(ph_drops):
 
     # Convert count to int
     menge_desc_tidy['count'] = menge_desc_tidy['count'].astype(int)
+
+    # Bootstrap all (Menge, Group) rows together
+    by_menge = dict(list(ph_drops_cleaned.groupby('Menge')))
+    menge_groups = [by_menge[menge][f'drop_{group}'].dropna().to_numpy()
+                    for menge, group in zip(menge_desc_tidy['Menge'], menge_desc_tidy['Group'])]
+    for col, values in _ci_columns(menge_groups, **bootstrap_kwargs).items():
+        menge_desc_tidy[col] = values
     
     menge_output_path = os.path.join(OUT_DIR, 'descriptive_statistics_mengen.csv')
     menge_desc_tidy.to_csv(menge_output_path, index=False)
     print(f"Descriptive statistics by Menge saved to '{menge_output_path}'")
 
 
+def menge_sufficient_statistics(ph_drops):
+    """Computes the sufficient statistics of the pH drop per Menge and condition.
+
+    Returns a dict mapping each condition to (levels, n, mean, m2) arrays with
+    the sorted numeric Menge levels, group sizes, means and sums of squared
+    deviations; levels without data for a condition are left out.
+    """
+    drops = ph_drops[['Menge', 'drop_gekocht', 'drop_ungekocht']].copy()
+    drops['Menge'] = pd.to_numeric(drops['Menge'], errors='coerce')
+    drops = drops.dropna(subset=['Menge'])
+    grouped = drops.groupby('Menge')[['drop_gekocht', 'drop_ungekocht']].agg(['count', 'mean', 'var'])
+
+    summaries = {}
+    for condition in CONDITIONS:
+        summary = grouped[f'drop_{condition}']
+        summary = summary[summary['count'] > 0]
+        n = summary['count'].to_numpy(dtype=float)
+        m2 = np.where(n > 1, summary['var'].to_numpy() * (n - 1), 0.0)
+        summaries[condition] = (summary.index.to_numpy(), n, summary['mean'].to_numpy(), m2)
+    return summaries
+
+
+def anova_from_statistics(n, mean, m2):
+    """One-way ANOVA F statistic and p-value from group sizes, means and M2."""
+    k, total = len(n), n.sum()
+    grand_mean = (n * mean).sum() / total
+    ms_between = (n * (mean - grand_mean) ** 2).sum() / (k - 1)
+    ms_within = m2.sum() / (total - k)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f_stat = ms_between / ms_within
+    return f_stat, stats.f.sf(f_stat, k - 1, total - k)
+
+
+def _studentized_range_sf(q, k, df):
+    """Survival function of the studentized range distribution, vectorized over q.
+
+    scipy's studentized_range integrates every value separately, which takes
+    seconds for a few hundred pairs. Here the distribution of the range of k
+    standard normals is tabulated once on a fine grid and then averaged over
+    the chi-distributed standard deviation estimate (accurate to about 1e-6).
+    """
+    q = np.asarray(q, dtype=float)
+    if df <= 0:
+        return np.full(q.shape, np.nan)
+
+    z = np.linspace(-8, 8, 401)
+    w = np.linspace(0, 12, 2401)
+    spread = np.clip(special.ndtr(z) - special.ndtr(z - w[:, None]), 0, None)
+    range_cdf = np.clip(k * trapezoid(stats.norm.pdf(z) * spread ** (k - 1), z, axis=1), 0, 1)
+
+    s = np.linspace(*stats.chi.ppf([1e-12, 1 - 1e-12], df), 513) / np.sqrt(df)
+    density = stats.chi.pdf(s * np.sqrt(df), df) * np.sqrt(df)
+    cdf = np.interp(q[..., None] * s, w, range_cdf, right=1.0)
+    sf = 1 - trapezoid(density * cdf, s, axis=-1) / trapezoid(density, s)
+    return np.where(np.isnan(q), np.nan, np.clip(sf, 0, 1))
+
+
+def pairwise_posthoc(levels, n, mean, m2):
+    """All-pairs post-hoc tests between groups from their sufficient statistics.
+
+    Every pair gets a pooled two-sample t-test with Bonferroni and Holm adjusted
+    p-values, plus the Tukey-Kramer HSD p-value based on the ANOVA error term.
+    All pairs are computed at once as array operations.
+    """
+    i, j = np.triu_indices(len(levels), 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dof = n[i] + n[j] - 2
+        pooled_var = (m2[i] + m2[j]) / dof
+        diff = mean[i] - mean[j]
+        t_stat = diff / np.sqrt(pooled_var * (1 / n[i] + 1 / n[j]))
+        p_val = 2 * stats.t.sf(np.abs(t_stat), dof)
+
+        num_comparisons = len(i)
+        p_bonferroni = np.minimum(p_val * num_comparisons, 1)
+        order = np.argsort(p_val)
+        p_holm = np.empty(num_comparisons)
+        p_holm[order] = np.minimum(np.maximum.accumulate((num_comparisons - np.arange(num_comparisons)) * p_val[order]), 1)
+
+        error_dof = n.sum() - len(levels)
+        mse = m2.sum() / error_dof
+        q_stat = np.abs(diff) / np.sqrt(mse / 2 * (1 / n[i] + 1 / n[j]))
+    p_tukey = _studentized_range_sf(q_stat, len(levels), error_dof)
+
+    return pd.DataFrame({
+        'Menge 1': levels[i],
+        'Menge 2': levels[j],
+        'N 1': n[i].astype(int),
+        'N 2': n[j].astype(int),
+        'Mean 1': mean[i],
+        'Mean 2': mean[j],
+        't-statistic': t_stat,
+        'df': dof,
+        'p-value': p_val,
+        'p-value (Bonferroni)': p_bonferroni,
+        'p-value (Holm)': p_holm,
+        'q-statistic': q_stat,
+        'p-value (Tukey HSD)': p_tukey,
+    })
+
+
 def perform_statistical_analysis(ph_drops):
     """Performs statistical analysis and saves results to CSV."""
     if not os.path.exists(OUT_DIR):
@@ -227,14 +902,11 @@ def perform_statistical_analysis(ph_drops):
 
 
     # 2. ANOVA: Effect of 'Menge' on pH drop for 'ungekocht'
-    menge_groups = ph_drops[['Menge', 'drop_ungekocht']].dropna()
-    menge_groups['Menge'] = pd.to_numeric(menge_groups['Menge'], errors='coerce').dropna()
-    unique_mengen = sorted(menge_groups['Menge'].unique())
+    summaries = menge_sufficient_statistics(ph_drops)
+    unique_mengen, n, mean, m2 = summaries['ungekocht']
     
     if len(unique_mengen) > 1:
-        grouped_data = [menge_groups['drop_ungekocht'][menge_groups['Menge'] == m] for m in unique_mengen]
-        
-        f_stat, p_val_anova = stats.f_oneway(*grouped_data)
+        f_stat, p_val_anova = anova_from_statistics(n, mean, m2)
         analysis_results.append({
             'Test': 'ANOVA',
             'Comparison': "Effect of 'Menge' on pH Drop (Ungekocht)",
@@ -245,22 +917,16 @@ def perform_statistical_analysis(ph_drops):
 
         # 3. Pairwise T-tests (post-hoc) if ANOVA is significant
         if p_val_anova < 0.05:
-            pairs = list(itertools.combinations(unique_mengen, 2))
-            num_comparisons = len(pairs)
-            bonferroni_alpha = 0.05 / num_comparisons
-
-            for m1, m2 in pairs:
-                group1 = menge_groups['drop_ungekocht'][menge_groups['Menge'] == m1]
-                group2 = menge_groups['drop_ungekocht'][menge_groups['Menge'] == m2]
-                
-                t_stat_pair, p_val_pair = stats.ttest_ind(group1, group2, nan_policy='omit')
-                
+            pairwise = pairwise_posthoc(unique_mengen, n, mean, m2)
+            bonferroni_alpha = 0.05 / len(pairwise)
+
+            for _, row in pairwise.iterrows():
                 analysis_results.append({
                     'Test': 'Pairwise T-test (Bonferroni)',
-                    'Comparison': f"'Menge' {m1} vs {m2}",
-                    'Statistic': f't = {t_stat_pair:.3f}',
-                    'p-value': f'{p_val_pair:.3e}',
-                    'Significance': 'Yes' if p_val_pair < bonferroni_alpha else 'No'
+                    'Comparison': f"'Menge' {row['Menge 1']} vs {row['Menge 2']}",
+                    'Statistic': f"t = {row['t-statistic']:.3f}",
+                    'p-value': f"{row['p-value']:.3e}",
+                    'Significance': 'Yes' if row['p-value'] < bonferroni_alpha else 'No'
                 })
     else:
         analysis_results.append({
@@ -271,36 +937,116 @@ def perform_statistical_analysis(ph_drops):
             'Significance': 'N/A'
         })
 
+    # 4. Full post-hoc matrix for both conditions
+    posthoc_tables = []
+    for condition in CONDITIONS:
+        if len(summaries[condition][0]) > 1:
+            table = pairwise_posthoc(*summaries[condition])
+            table.insert(0, 'Group', condition)
+            posthoc_tables.append(table)
+    posthoc = pd.concat(posthoc_tables, ignore_index=True) if posthoc_tables else pd.DataFrame()
+    posthoc_output_path = os.path.join(OUT_DIR, 'posthoc_comparisons.csv')
+    posthoc.to_csv(posthoc_output_path, index=False)
+    print(f"Post-hoc comparisons saved to '{posthoc_output_path}'")
+
     # Save results to CSV
     results_df = pd.DataFrame(analysis_results)
     results_df.to_csv(os.path.join(OUT_DIR, 'statistical_analysis.csv'), index=False)
     print(f"\nStatistical analysis saved to '{os.path.join(OUT_DIR, 'statistical_analysis.csv')}'")
 
 
-def plot_average(df, plot_title, filename, group_by_col=None, plot_type='both', window_size=15):
-    """Generates and saves a smoothed average plot."""
+def resample_curves(df, step=TIME_GRID_STEP):
+    """Interpolates every (Stdgang, Gruppe) curve onto a shared time grid.
+
+    Returns the grid, a frame with the Stdgang, Gruppe and Menge of every group
+    and a dict mapping each condition to a (groups x grid points) array. Grid
+    points outside a group's measured time range are NaN. All groups are
+    interpolated in one searchsorted call by offsetting each group's times.
+    """
+    df, codes, starts = _sorted_groups(df)
+    groups = df.iloc[starts][GROUP_KEYS + ['Menge']].reset_index(drop=True)
+    t = df['Zeit'].to_numpy(dtype=float)
+    if df.empty:
+        return np.array([]), groups, {condition: np.empty((0, 0)) for condition in CONDITIONS}
+
+    grid = np.arange(np.floor(t.min() / step) * step, t.max() + step, step)
+    offset = grid[-1] - grid[0] + 2 * step
+    n_groups = len(starts)
+    query = (grid[None, :] + (np.arange(n_groups) * offset)[:, None]).ravel()
+    query_group = np.repeat(np.arange(n_groups), len(grid))
+
+    curves = {}
+    for condition in CONDITIONS:
+        y = df[f'pH_{condition}'].to_numpy(dtype=float)
+        valid = ~np.isnan(y)
+        x, y, x_group = t[valid] + codes[valid] * offset, y[valid], codes[valid]
+
+        # Neighbouring measurements of every grid point, both within its group
+        right = np.searchsorted(x, query, side='right')
+        left = right - 1
+        right = np.minimum(right, len(x) - 1)
+        left_ok = (left >= 0) & (x_group[np.maximum(left, 0)] == query_group)
+        right_ok = (x_group[right] == query_group) & (x[right] > query)
+        left = np.maximum(left, 0)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            frac = (query - x[left]) / (x[right] - x[left])
+            values = np.where(left_ok & right_ok, y[left] + frac * (y[right] - y[left]), np.nan)
+        exact = left_ok & (x[left] == query)
+        values = np.where(exact, y[left], values)
+        curves[condition] = values.reshape(n_groups, len(grid))
+    return grid, groups, curves
+
+
+def _moving_average(values, window):
+    """Centered, NaN-aware moving average over the last axis with `window` points."""
+    half = window // 2
+    valid = ~np.isnan(values)
+    padding = [(0, 0)] * (values.ndim - 1) + [(half + 1, half)]
+    sums = np.cumsum(np.pad(np.where(valid, values, 0.0), padding), axis=-1)
+    counts = np.cumsum(np.pad(valid.astype(float), padding), axis=-1)
+    window_sums = sums[..., window:] - sums[..., :-window]
+    window_counts = counts[..., window:] - counts[..., :-window]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return window_sums / window_counts
+
+
+def summarize_curves(values, mask=None, window_size=15, step=TIME_GRID_STEP):
+    """Averages resampled curves into a smoothed mean with a 95% confidence band.
+
+    `values` is a (groups x grid points) array, `mask` selects the groups to
+    average. The mean and its standard error are smoothed with a centered
+    moving average over `window_size` minutes. Returns (mean, lower, upper).
+    """
+    if mask is not None:
+        values = values[np.asarray(mask)]
+    valid = ~np.isnan(values)
+    n = valid.sum(axis=0)
+    filled = np.where(valid, values, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = filled.sum(axis=0) / n
+        var = (np.where(valid, values - mean, 0.0) ** 2).sum(axis=0) / (n - 1)
+        sem = np.sqrt(var / n)
+
+    window = max(1, int(round(window_size / step)))
+    mean, sem = _moving_average(np.stack([mean, sem]), window)
+    return mean, mean - 1.96 * sem, mean + 1.96 * sem
+
+
+def plot_average(grid, curves, plot_title, filename):
+    """Generates and saves a plot of smoothed average pH curves.
+
+    `curves` maps a legend label to (condition, mean, lower, upper) arrays on
+    `grid`, as returned by summarize_curves; the band is drawn around the mean.
+    """
     plt.figure(figsize=(12, 7))
+    markevery = max(1, len(grid) // 40)
 
-    if plot_type == 'both':
-        # Assumes df is pre-averaged by time
-        df_sorted = df.sort_values(by='Zeit').reset_index(drop=True)
-        gekocht_smooth = df_sorted['pH_gekocht'].rolling(window=window_size, center=True, min_periods=1).mean()
-        plt.plot(df_sorted['Zeit'], gekocht_smooth, marker='o', linestyle='-', label='Gekocht (Durchschnitt, geglättet)')
-        
-        ungekocht_smooth = df_sorted['pH_ungekocht'].rolling(window=window_size, center=True, min_periods=1).mean()
-        plt.plot(df_sorted['Zeit'], ungekocht_smooth, marker='x', linestyle='--', label='Ungekocht (Durchschnitt, geglättet)')
-    
-    else:  # 'gekocht' or 'ungekocht'
-        # Assumes df is the full lipase_df, and groups it by the group_by_col
-        value_col = f'pH_{plot_type}'
-        marker = 'o' if plot_type == 'gekocht' else 'x'
-        linestyle = '-' if plot_type == 'gekocht' else '--'
-
-        for name, group in df.groupby(group_by_col):
-            avg_group_df = group.groupby('Zeit')[value_col].mean().reset_index()
-            avg_group_df = avg_group_df.sort_values(by='Zeit').reset_index(drop=True)
-            smooth_ph = avg_group_df[value_col].rolling(window=window_size, center=True, min_periods=1).mean()
-            plt.plot(avg_group_df['Zeit'], smooth_ph, marker=marker, linestyle=linestyle, label=f'Menge {name}')
+    for label, (condition, mean, lower, upper) in curves.items():
+        marker = 'o' if condition == 'gekocht' else 'x'
+        linestyle = '-' if condition == 'gekocht' else '--'
+        line, = plt.plot(grid, mean, marker=marker, markevery=markevery, linestyle=linestyle, label=label)
+        plt.fill_between(grid, lower, upper, color=line.get_color(), alpha=0.2, linewidth=0)
 
     plt.title(plot_title)
     plt.xlabel('Zeit (min)')
@@ -311,80 +1057,218 @@ def plot_average(df, plot_title, filename, group_by_col=None, plot_type='both',
     plt.close()
 
 
+def group_plot_filename(stdgang, gruppe):
+    """Returns the sanitized file name of a group's pH time course plot."""
+    return f"{stdgang}_Gruppe_{gruppe}.png".replace("/", "_")
+
+
+def plot_group(group_df, stdgang, gruppe):
+    """Generates and saves the pH time course of a single experimental group."""
+    plt.figure(figsize=(10, 6))
+
+    plt.plot(group_df['Zeit'], group_df['pH_gekocht'], marker='o', linestyle='-', label='Gekocht')
+    plt.plot(group_df['Zeit'], group_df['pH_ungekocht'], marker='x', linestyle='--', label='Ungekocht')
+
+    plt.title(f'pH-Verlauf für {stdgang} - Gruppe {gruppe}')
+    plt.xlabel('Zeit (min)')
+    plt.ylabel('pH-Wert')
+    plt.legend()
+    plt.grid(True)
+
+    plt.savefig(os.path.join(PLOTS_DIR, group_plot_filename(stdgang, gruppe)))
+    plt.close()
+
+
+def _init_plot_worker():
+    """Switches a plot worker process to the non-interactive Agg backend."""
+    matplotlib.use('Agg')
+
+
+def render_plots(jobs, workers=1):
+    """Renders plot jobs given as (outputs, function, args, kwargs) tuples.
+
+    Every job draws and saves exactly one figure with the Agg backend, so the
+    files are the same whether they are rendered serially (`workers` = 1) or
+    spread across a pool of `workers` processes (0 uses all CPU cores).
+    """
+    _init_plot_worker()
+    if workers == 1 or len(jobs) <= 1:
+        for _, func, args, kwargs in jobs:
+            func(*args, **kwargs)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_plot_worker) as pool:
+        futures = [pool.submit(func, *args, **kwargs) for _, func, args, kwargs in jobs]
+        for future in futures:
+            future.result()
+
+
 def main():
     """Main function to run the analysis."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Analyze Lipase experiment data')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Parse the input CSVs from scratch without reading or writing the cache')
+    parser.add_argument('--workbook', nargs='?', const=WORKBOOK_XLSX, metavar='XLSX',
+                        help=f"Read the '{TN_LIST_SHEET}' and '{LIPASE_SHEET}' sheets straight from the workbook "
+                             f"instead of the exported CSVs (default workbook: {WORKBOOK_XLSX})")
+    parser.add_argument('--clear-cache', action='store_true',
+                        help=f"Remove all cached frames and the output manifest in '{CACHE_DIR}' before running")
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of processes for rendering plots and bootstrapping, 0 for all CPU cores (default: %(default)s)')
+    parser.add_argument('--bootstrap-resamples', type=int, default=10000,
+                        help='Number of bootstrap resamples for confidence intervals (default: %(default)s)')
+    parser.add_argument('--bootstrap-seed', type=int, default=0,
+                        help='Random seed for the bootstrap (default: %(default)s)')
+    parser.add_argument('--ci-method', choices=['bca', 'percentile'], default='bca',
+                        help='Bootstrap confidence interval method (default: %(default)s)')
+    parser.add_argument('--force', action='store_true',
+                        help='Rebuild all plots and statistics, even if their inputs did not change')
+    parser.add_argument('--bundle', action='store_true',
+                        help=f"Also collect all statistics, the cleaned data, the plots and the run metadata in '{BUNDLE_PATH}'")
+    parser.add_argument('--profile', action='store_true',
+                        help=f"Record wall time, CPU time and peak memory per stage in '{OUT_DIR}/profile.json'")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='Like --profile, and trace the peak allocations of every stage (slows the run down)')
+    args = parser.parse_args()
+
+    if args.clear_cache:
+        clear_cache()
+
     # Create plots directory if it doesn't exist
     for dir_path in [PLOTS_DIR, OUT_DIR]:
         if not os.path.exists(dir_path):
             os.makedirs(dir_path)
 
     # Load and clean data
-    tn_df = load_clean_participant_list(TN_LIST_CSV)
+    profiler = StageProfiler(enabled=args.profile or args.profile_memory, trace_memory=args.profile_memory)
+    use_cache = not args.no_cache
+    with profiler.stage('parse participants'):
+        if args.workbook:
+            tn_df = load_cached(load_clean_participant_list, args.workbook, CACHE_DIR, PARSER_VERSION,
+                                sheet=TN_LIST_SHEET, use_cache=use_cache)
+        else:
+            tn_df = load_cached(load_clean_participant_list, TN_LIST_CSV, CACHE_DIR, PARSER_VERSION, use_cache=use_cache)
     print("Participant Data:")
     print(tn_df.head())
+    print("\nParticipant Data Memory Usage:")
+    print(memory_report(tn_df))
     
-    lipase_df = load_clean_lipase_results(LIPASE_CSV)
+    with profiler.stage('parse lipase'):
+        if args.workbook:
+            lipase_df = load_cached(load_clean_lipase_results, args.workbook, CACHE_DIR, PARSER_VERSION,
+                                    sheet=LIPASE_SHEET, use_cache=use_cache)
+        else:
+            lipase_df = load_cached(load_clean_lipase_results, LIPASE_CSV, CACHE_DIR, PARSER_VERSION, use_cache=use_cache)
     print("\nLipase Results:")
     print(lipase_df.head())
 
 
-    # --- Individual Group Plots ---
-    # Use a list for groupby to avoid tuple unpacking issues with some linters
-    for (stdgang, gruppe), group_df in lipase_df.groupby(['Stdgang', 'Gruppe']):
-        plt.figure(figsize=(10, 6))
-        
-        plt.plot(group_df['Zeit'], group_df['pH_gekocht'], marker='o', linestyle='-', label='Gekocht')
-        plt.plot(group_df['Zeit'], group_df['pH_ungekocht'], marker='x', linestyle='--', label='Ungekocht')
-
-        plt.title(f'pH-Verlauf für {stdgang} - Gruppe {gruppe}')
-        plt.xlabel('Zeit (min)')
-        plt.ylabel('pH-Wert')
-        plt.legend()
-        plt.grid(True)
-        
-        # Sanitize filename
-        filename = f"{stdgang}_Gruppe_{gruppe}.png".replace("/", "_")
-        plt.savefig(os.path.join(PLOTS_DIR, filename))
-        plt.close()
-
     if lipase_df.empty:
         print("\nLipase DataFrame is empty. Skipping plotting and analysis.")
         return
 
-    # Calculate pH drops for analysis
-    ph_drops = calculate_ph_drop(lipase_df)
+    # Calculate kinetic features and pH drops for analysis
+    with profiler.stage('drop calculation'):
+        features = extract_kinetic_features(lipase_df)
+        ph_drops = calculate_ph_drop(lipase_df, features=features)
+
+    manifest = load_manifest()
+    n_plots, n_rebuilt = 0, 0
+
+    def plot_path(filename):
+        return [os.path.join(PLOTS_DIR, filename)]
+
+    def render_family(plot_jobs):
+        nonlocal n_plots, n_rebuilt
+        outdated_plot_jobs = outdated_jobs(plot_jobs, manifest, force=args.force)
+        render_plots(outdated_plot_jobs, workers=args.workers)
+        n_plots += len(plot_jobs)
+        n_rebuilt += len(outdated_plot_jobs)
+
+    # --- Individual Group Plots ---
+    # Use a list for groupby to avoid tuple unpacking issues with some linters
+    with profiler.stage('plots: groups'):
+        render_family([(plot_path(group_plot_filename(stdgang, gruppe)), plot_group, (group_df, stdgang, gruppe), {})
+                       for (stdgang, gruppe), group_df in lipase_df.groupby(['Stdgang', 'Gruppe'])])
+
+    # --- Average Plots on a shared time grid ---
+    with profiler.stage('resample curves'):
+        grid, groups, curves = resample_curves(lipase_df)
+    both_labels = {'gekocht': 'Gekocht (Durchschnitt, geglättet)', 'ungekocht': 'Ungekocht (Durchschnitt, geglättet)'}
 
     # --- Overall Average Plot ---
-    avg_df_all = lipase_df.groupby('Zeit')[['pH_gekocht', 'pH_ungekocht']].mean().reset_index()
-    plot_average(avg_df_all, 'Durchschnittlicher pH-Verlauf über alle Gruppen (geglättet)', "average_ph_verlauf.png")
+    with profiler.stage('plots: overall average'):
+        plot_title = 'Durchschnittlicher pH-Verlauf über alle Gruppen (geglättet)'
+        filename = "average_ph_verlauf.png"
+        averages = {label: (condition, *summarize_curves(curves[condition])) for condition, label in both_labels.items()}
+        render_family([(plot_path(filename), plot_average, (grid, averages, plot_title, filename), {})])
 
     # --- Average Plots per "Menge" ---
-    for menge, menge_df in lipase_df.groupby('Menge'):
-        avg_menge_df = menge_df.groupby('Zeit')[['pH_gekocht', 'pH_ungekocht']].mean().reset_index()
-        plot_title = f'Durchschnittlicher pH-Verlauf für Menge {menge} (geglättet)'
-        filename = f"average_ph_verlauf_menge_{menge}.png"
-        plot_average(avg_menge_df, plot_title, filename)
-
-    # --- Comparative Plot for Gekocht by Menge ---
-    plot_average(lipase_df,
-                 'Vergleich pH-Verlauf (Gekocht) nach Menge',
-                 "vergleich_gekocht_nach_menge.png",
-                 group_by_col='Menge',
-                 plot_type='gekocht')
-
-    # --- Comparative Plot for Ungekocht by Menge ---
-    plot_average(lipase_df,
-                 'Vergleich pH-Verlauf (Ungekocht) nach Menge',
-                 "vergleich_ungekocht_nach_menge.png",
-                 group_by_col='Menge',
-                 plot_type='ungekocht')
-
-    print(f"\nPlots saved to '{PLOTS_DIR}' directory.")
+    mengen = sorted(groups['Menge'].dropna().unique())
+    with profiler.stage('plots: menge averages'):
+        plot_jobs = []
+        for menge in mengen:
+            in_menge = (groups['Menge'] == menge).to_numpy()
+            plot_title = f'Durchschnittlicher pH-Verlauf für Menge {menge} (geglättet)'
+            filename = f"average_ph_verlauf_menge_{menge}.png"
+            averages = {label: (condition, *summarize_curves(curves[condition], in_menge))
+                        for condition, label in both_labels.items()}
+            plot_jobs.append((plot_path(filename), plot_average, (grid, averages, plot_title, filename), {}))
+        render_family(plot_jobs)
+
+    # --- Comparative Plots for Gekocht and Ungekocht by Menge ---
+    with profiler.stage('plots: comparisons'):
+        plot_jobs = []
+        for condition, label in [('gekocht', 'Gekocht'), ('ungekocht', 'Ungekocht')]:
+            plot_title = f'Vergleich pH-Verlauf ({label}) nach Menge'
+            filename = f"vergleich_{condition}_nach_menge.png"
+            averages = {f'Menge {menge}': (condition, *summarize_curves(curves[condition], (groups['Menge'] == menge).to_numpy()))
+                        for menge in mengen}
+            plot_jobs.append((plot_path(filename), plot_average, (grid, averages, plot_title, filename), {}))
+        render_family(plot_jobs)
+
+    print(f"\nPlots saved to '{PLOTS_DIR}' directory "
+          f"({n_rebuilt} rebuilt, {n_plots - n_rebuilt} up to date).")
 
     # --- Statistical and Descriptive Analysis ---
-    perform_statistical_analysis(ph_drops)
-    perform_descriptive_analysis(ph_drops)
+    with profiler.stage('decay fits'):
+        fits = fit_decay_curves(lipase_df)
+    analysis_jobs = [
+        ('statistics: statistical analysis',
+         [os.path.join(OUT_DIR, 'statistical_analysis.csv'), os.path.join(OUT_DIR, 'posthoc_comparisons.csv')],
+         perform_statistical_analysis, (ph_drops,), {}),
+        ('statistics: descriptive analysis',
+         [os.path.join(OUT_DIR, 'descriptive_statistics_overall.csv'),
+          os.path.join(OUT_DIR, 'descriptive_statistics_overall_ci.csv'),
+          os.path.join(OUT_DIR, 'descriptive_statistics_mengen.csv')],
+         perform_descriptive_analysis, (ph_drops,),
+         {'n_resamples': args.bootstrap_resamples, 'seed': args.bootstrap_seed,
+          'ci_method': args.ci_method, 'workers': args.workers}),
+        ('statistics: kinetic features', [os.path.join(OUT_DIR, 'kinetic_features.csv')],
+         save_kinetic_features, (features,), {}),
+        ('statistics: kinetic fits', [os.path.join(OUT_DIR, 'kinetic_fits.csv')],
+         save_decay_fits, (fits,), {}),
+    ]
+    for stage, *job in analysis_jobs:
+        for _, func, func_args, kwargs in outdated_jobs([tuple(job)], manifest, force=args.force):
+            with profiler.stage(stage):
+                func(*func_args, **kwargs)
+
+    save_manifest(manifest)
+
+    if args.bundle:
+        with profiler.stage('bundle'):
+            save_bundle(tn_df, lipase_df, workbook=args.workbook, bootstrap_resamples=args.bootstrap_resamples,
+                        bootstrap_seed=args.bootstrap_seed, ci_method=args.ci_method)
 
+    if profiler.enabled:
+        profile_path = os.path.join(OUT_DIR, 'profile.json')
+        profiler.save(profile_path, script='analyze_lipase.py', rows=len(lipase_df),
+                      groups=int(lipase_df.groupby(GROUP_KEYS).ngroups), workers=args.workers,
+                      cache=use_cache, force=args.force)
+        print(f"Profile saved to '{profile_path}'")
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
@@ -0,0 +1,205 @@
+"""
+Benchmark for the Lipase analysis.
+- Generates a synthetic block-structured Lipase CSV of arbitrary size
+- Times the CSV parser against the original line-by-line implementation
+- Checks that both parsers produce the same tidy DataFrame
+- Runs a size sweep over the analysis steps and keeps the timings per commit
+"""
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+from analyze_lipase import load_clean_lipase_results, calculate_ph_drop, perform_statistical_analysis
+
+# Timing and result store shared with the other benchmarks, in labtools/ at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from labtools.benchmark import add_suite_arguments, run_suite, store_results, time_call
+
+SYNTHETIC_CSV = 'synthetic-Lipase.csv'
+
+
+def legacy_load_clean_lipase_results(path):
+    """The original line-by-line parser, kept as reference for the benchmark."""
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+
+    header = [h.strip() for h in lines[0].strip().split(',')]
+    data = []
+    current_meta = {}
+
+    for line in lines[1:]:
+        line = line.strip()
+        if not line:
+            continue
+
+        reader = csv.reader(StringIO(line), delimiter=',', quotechar='"')
+        values = next(reader)
+        values = [v.strip().strip('"') for v in values]
+
+        is_meta = bool(values[0] or values[1])
+
+        if is_meta:
+            line_meta = dict(zip(header, values))
+            for k, v in line_meta.items():
+                current_meta[k] = v
+
+            if line_meta.get('gekocht') or line_meta.get('ungekocht'):
+                data.append(current_meta.copy())
+        else:
+            zeit_idx = header.index('Zeit')
+
+            if len(values) > zeit_idx and values[zeit_idx]:
+                measurement_row = current_meta.copy()
+                measurement_row['Zeit'] = values[zeit_idx]
+                measurement_row['gekocht'] = values[zeit_idx + 1] if len(values) > zeit_idx + 1 else ''
+                measurement_row['ungekocht'] = values[zeit_idx + 2] if len(values) > zeit_idx + 2 else ''
+                data.append(measurement_row)
+
+    df = pd.DataFrame(data)
+
+    if df.empty:
+        return df
+
+    df['Datum'] = pd.to_datetime(df['Datum'], dayfirst=True, errors='coerce')
+
+    for col in ['Datum', 'Stdgang', 'Gruppe', 'Menge']:
+        if col in df.columns:
+            df[col] = df[col].replace('', np.nan).ffill()
+
+    df.rename(columns={'gekocht': 'pH_gekocht', 'ungekocht': 'pH_ungekocht'}, inplace=True)
+
+    for col in ['Zeit', 'pH_gekocht', 'pH_ungekocht']:
+        df[col] = df[col].astype(str).str.replace(',', '.').replace('-', np.nan).replace(' ', '')
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    df = df.dropna(subset=['Zeit'])
+    df = df.dropna(subset=['pH_gekocht', 'pH_ungekocht'], how='all')
+
+    return df
+
+
+def _german_decimal(values):
+    """Formats floats the way the lab export does ("9,8" quoted, "10" bare)."""
+    text = pd.Series(values).round(2).astype(str).str.replace(r'\.0$', '', regex=True)
+    return np.where(text.str.contains('.', regex=False), '"' + text.str.replace('.', ',') + '"', text)
+
+
+def generate_lipase_csv(path, n_rows, seed=0):
+    """Writes a synthetic block-structured Lipase CSV with about `n_rows` lines.
+
+    Every block starts with a meta line (Datum, Stdgang, Gruppe, Menge and an
+    optional remark) followed by a variable number of measurement lines with
+    irregular time points and German decimal commas, like the real export.
+    Every block is the curve of its own (Stdgang, Gruppe).
+    """
+    rng = np.random.default_rng(seed)
+    n_blocks = max(1, n_rows // 8)
+    block_sizes = rng.integers(4, 13, size=n_blocks)
+    n = int(block_sizes.sum())
+    starts = np.repeat(np.cumsum(block_sizes) - block_sizes, block_sizes)
+    is_meta = np.arange(n) == starts
+
+    block = np.repeat(np.arange(n_blocks), block_sizes)
+    blocks = pd.Series(np.arange(n_blocks))
+    years = 2016 + blocks // 5000
+    datum = ((blocks % 28 + 1).astype(str) + '/' + (blocks % 12 + 1).astype(str) + '/' + years.astype(str)).to_numpy()[block]
+    stdgang = ('MBI' + (years - 2001).astype(str) + '_Grp' + (blocks // 6 + 1).astype(str)).to_numpy()[block]
+    gruppe = np.array(list('ABCDEF'))[block % 6]
+    menge = np.array(['200', '350', '500'])[block % 3]
+    sonstiges = np.where(rng.random(n_blocks) < 0.05, 'kaputtes Enzym', '')[block]
+
+    step = np.where(is_meta, 0.0, rng.choice([0.5, 1.0, 1.5, 5.0, 10.0, 15.0], size=n))
+    zeit = np.cumsum(step) - np.repeat(np.cumsum(step)[is_meta], block_sizes)
+    gekocht = 10.0 - 0.005 * zeit + rng.normal(0, 0.1, size=n)
+    ungekocht = 10.0 - 0.02 * zeit + rng.normal(0, 0.1, size=n)
+
+    def meta_only(values):
+        return np.where(is_meta, values, '')
+
+    df = pd.DataFrame({
+        'Datum': meta_only(datum),
+        'Stdgang': meta_only(stdgang),
+        'Gruppe': meta_only(gruppe),
+        'Menge': meta_only(menge),
+        'Sonstiges': meta_only(sonstiges),
+        'Zeit': _german_decimal(zeit),
+        'gekocht': _german_decimal(gekocht),
+        'ungekocht': _german_decimal(ungekocht),
+    })
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(','.join(df.columns) + '\n')
+        lines = df[df.columns[0]].str.cat([df[col] for col in df.columns[1:]], sep=',')
+        f.write('\n'.join(lines) + '\n')
+    return n
+
+
+def benchmark_parser(n_rows, chunksize, skip_legacy=False):
+    """Times the bulk, chunked and (optionally) legacy parser on a synthetic file."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, SYNTHETIC_CSV)
+        n_lines, gen_time = time_call(generate_lipase_csv, path, n_rows)
+        print(f"Generated {n_lines:,} lines in {gen_time:.1f}s")
+
+        bulk_df, bulk_time = time_call(load_clean_lipase_results, path)
+        print(f"Bulk parser:    {bulk_time:8.2f}s")
+        chunked_df, chunked_time = time_call(load_clean_lipase_results, path, chunksize=chunksize)
+        print(f"Chunked parser: {chunked_time:8.2f}s (chunksize={chunksize:,})")
+        pd.testing.assert_frame_equal(bulk_df, chunked_df)
+
+        if not skip_legacy:
+            legacy_df, legacy_time = time_call(legacy_load_clean_lipase_results, path)
+            print(f"Legacy parser:  {legacy_time:8.2f}s")
+            pd.testing.assert_frame_equal(bulk_df, legacy_df)
+            print(f"Speedup: {legacy_time / bulk_time:.1f}x (bulk), {legacy_time / chunked_time:.1f}x (chunked)")
+
+
+def benchmark_suite(sizes, repeat=1):
+    """Times the parser, the pH drop calculation and the statistical analysis per input size.
+
+    Every size gets its own synthetic file; the best of `repeat` runs is kept.
+    Returns one row per function and size.
+    """
+    def setup(tmp_dir, n_rows):
+        n_lines = generate_lipase_csv(os.path.join(tmp_dir, SYNTHETIC_CSV), n_rows)
+        return f"{n_lines:,} lines"
+
+    def steps(tmp_dir):
+        # perform_statistical_analysis writes its tables to ./out, inside tmp_dir
+        df, load_time = time_call(load_clean_lipase_results, os.path.join(tmp_dir, SYNTHETIC_CSV))
+        ph_drops, drop_time = time_call(calculate_ph_drop, df)
+        _, stats_time = time_call(perform_statistical_analysis, ph_drops)
+        return [('load_clean_lipase_results', load_time), ('calculate_ph_drop', drop_time),
+                ('perform_statistical_analysis', stats_time)]
+
+    return run_suite(sizes, setup, steps, repeat=repeat)
+
+
+def main():
+    """Main function to run the benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark the Lipase CSV parser on synthetic data')
+    parser.add_argument('--rows', type=int, default=3_000_000,
+                        help='Approximate number of lines in the synthetic CSV (default: %(default)s)')
+    parser.add_argument('--chunksize', type=int, default=500_000,
+                        help='Lines per chunk for the chunked parser (default: %(default)s)')
+    parser.add_argument('--skip-legacy', action='store_true',
+                        help='Do not run the slow original parser')
+    add_suite_arguments(parser, 'Time load_clean_lipase_results, calculate_ph_drop and perform_statistical_analysis '
+                                'over --sizes instead of comparing parsers', 'Input sizes (lines)')
+    args = parser.parse_args()
+
+    if args.suite:
+        store_results(benchmark_suite(args.sizes, repeat=args.repeat), args)
+        return
+
+    benchmark_parser(args.rows, args.chunksize, skip_legacy=args.skip_legacy)
+
+
+if __name__ == '__main__':
+    main()
@@ -28,12 +28,14 @@ echo "--- Running analysis script... ---"
 "$VENV_DIR/bin/python" "$ANALYSIS_DIR/analyze_lipase.py"
 
 # 4. Copy plots to the protocol's assets folder
+# The analysis only rewrites outputs whose inputs changed, so copying with -u
+# (only when the source is newer) skips all unchanged assets
 PLOT_SOURCE_DIR="$ANALYSIS_DIR/plots"
 PLOT_DEST_DIR="$PROTOCOL_DIR/assets/plots"
-echo "--- Copying plots to $PLOT_DEST_DIR... ---"
+echo "--- Copying changed plots to $PLOT_DEST_DIR... ---"
 mkdir -p "$PLOT_DEST_DIR"
-cp -r "$PLOT_SOURCE_DIR"/* "$PLOT_DEST_DIR/"
-cp -r "$ANALYSIS_DIR/out"/* "$PROTOCOL_DIR/assets/"
+cp -ru "$PLOT_SOURCE_DIR"/* "$PLOT_DEST_DIR/"
+cp -ru "$ANALYSIS_DIR/out"/* "$PROTOCOL_DIR/assets/"
 
 # 5. Compile the Typst protocol
 echo "--- Compiling Typst protocol... ---"
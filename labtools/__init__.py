@@ -0,0 +1,6 @@
+"""
+Helpers shared by the analysis scripts of the experiments (enzymes/analysis,
+senses/analysis). The scripts put the repository root on sys.path and import
+this package in place, as the protocols do with templates/; its dependencies
+are in both requirements.txt files.
+"""
@@ -0,0 +1,121 @@
+"""Size-sweep benchmark harness of the analyses (their benchmark_*.py --suite)
+
+A suite run times the steps of a pipeline on synthetic inputs of several
+sizes and appends the fastest time per step and size, keyed by commit, to
+RESULTS_CSV in the working directory, comparing it with an earlier commit.
+"""
+
+import contextlib
+import io
+import os
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+RESULTS_CSV = 'benchmark_results.csv'
+SUITE_SIZES = [10**3, 10**4, 10**5, 10**6]
+
+
+def time_call(func, *args, **kwargs):
+    """Return the result of `func` and its wall time in seconds"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def git_commit():
+    """Short hash of the checked-out commit, with '+dirty' for uncommitted changes"""
+    repository = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=repository,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        changes = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=repository,
+                                 capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return commit + ('+dirty' if changes else '')
+
+
+def run_suite(sizes, setup, steps, repeat=1, unit='rows'):
+    """Time the steps of a pipeline per input size, keeping the best of `repeat` runs
+
+    For every size, `setup(tmp_dir, size)` writes the synthetic input into a
+    fresh temporary directory and returns a short description of it, then
+    `steps(tmp_dir)` runs the pipeline once and returns its (function,
+    seconds) pairs. Both run inside the temporary directory, so outputs
+    written to relative paths stay there, and the steps' printing is
+    suppressed. Returns one row per function and size.
+    """
+    commit, date = git_commit(), datetime.now().isoformat(timespec='seconds')
+    records = []
+    cwd = os.getcwd()
+    for size in sizes:
+        timings = {}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.chdir(tmp_dir)
+            try:
+                description = setup(tmp_dir, size)
+                for _ in range(repeat):
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        for function, seconds in steps(tmp_dir):
+                            timings.setdefault(function, []).append(seconds)
+            finally:
+                os.chdir(cwd)
+
+        print(f"{size:>9,} {unit} ({description}):")
+        for function, times in timings.items():
+            print(f"  {function:<30} {min(times):8.3f}s")
+            records.append({'commit': commit, 'date': date, 'function': function,
+                            'rows': size, 'seconds': min(times)})
+    return pd.DataFrame(records)
+
+
+def compare_results(results, path, baseline=None):
+    """Print the timings next to those of `baseline` (default: the last other commit in `path`)"""
+    if not os.path.exists(path):
+        return
+    history = pd.read_csv(path, dtype={'commit': str})
+    history = history[history['commit'] != results['commit'].iloc[0]]
+    if baseline is None:
+        if history.empty:
+            return
+        baseline = history['commit'].iloc[-1]
+    previous = history[history['commit'] == baseline].drop_duplicates(['function', 'rows'], keep='last')
+    if previous.empty:
+        print(f"\nNo stored results for commit {baseline}")
+        return
+
+    table = results.merge(previous[['function', 'rows', 'seconds']], on=['function', 'rows'],
+                          how='left', suffixes=('', ' baseline'))
+    table['speedup'] = table['seconds baseline'] / table['seconds']
+    print(f"\nCompared to {baseline}:")
+    print(table[['function', 'rows', 'seconds', 'seconds baseline', 'speedup']].to_string(index=False, float_format='%.3f'))
+
+
+def save_results(results, path):
+    """Append the suite results to the CSV at `path`"""
+    results.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+    print(f"\nResults appended to '{path}'")
+
+
+def add_suite_arguments(parser, suite_help, sizes_help):
+    """Add --suite and the options of suite runs to the argparse `parser`"""
+    parser.add_argument('--suite', action='store_true', help=suite_help)
+    parser.add_argument('--sizes', type=int, nargs='+', default=SUITE_SIZES,
+                        help=f'{sizes_help} for --suite (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Runs per size for --suite, the fastest is kept (default: %(default)s)')
+    parser.add_argument('--baseline', metavar='COMMIT',
+                        help='Commit in the results file to compare --suite against (default: the last other one)')
+    parser.add_argument('--no-save', action='store_true',
+                        help=f'Do not append the --suite results to {RESULTS_CSV}')
+
+
+def store_results(results, args):
+    """Compare suite results with the --baseline commit and append them to RESULTS_CSV unless --no-save"""
+    compare_results(results, RESULTS_CSV, baseline=args.baseline)
+    if not args.no_save:
+        save_results(results, RESULTS_CSV)
@@ -0,0 +1,59 @@
+"""Single-file results bundles of the analyses (their --bundle options), needs pyarrow"""
+
+import io
+import json
+from pathlib import Path
+
+import pandas as pd
+
+# Schema metadata key of the run metadata, and the entry kinds that are
+# embedded DataFrames rather than files
+METADATA_KEY = b'results_bundle'
+FRAME_KINDS = ('table', 'data')
+
+
+def write_bundle(path, entries, metadata):
+    """Write (name, kind, value) entries and run metadata into one Parquet file
+
+    Every entry becomes a row of the bundle: DataFrames are embedded as
+    Parquet, paths (figures, reports) as the file's bytes. `metadata` is
+    stored as JSON in the schema metadata.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    names, kinds, contents = [], [], []
+    for name, kind, value in entries:
+        if isinstance(value, pd.DataFrame):
+            buffer = io.BytesIO()
+            value.to_parquet(buffer)
+            content = buffer.getvalue()
+        else:
+            content = Path(value).read_bytes()
+        names.append(name)
+        kinds.append(kind)
+        contents.append(content)
+
+    table = pa.table({'name': names, 'kind': kinds, 'content': pa.array(contents, type=pa.large_binary())})
+    table = table.replace_schema_metadata({METADATA_KEY: json.dumps(metadata, default=str)})
+    # The embedded tables and figures are compressed already
+    pq.write_table(table, path, compression='none')
+
+
+def read_bundle(path, kinds=None):
+    """Read a results bundle written by write_bundle
+
+    Returns the run metadata and a dict of the entries by name, with tables
+    as DataFrames and files as bytes. `kinds` restricts the entries, e.g. to
+    ['table'].
+    """
+    import pyarrow.parquet as pq
+
+    bundle = pq.read_table(path)
+    metadata = json.loads(bundle.schema.metadata[METADATA_KEY])
+    entries = {}
+    for name, kind, content in zip(*bundle.to_pydict().values()):
+        if kinds is not None and kind not in kinds:
+            continue
+        entries[name] = pd.read_parquet(io.BytesIO(content)) if kind in FRAME_KINDS else content
+    return metadata, entries
@@ -0,0 +1,77 @@
+"""Per-stage profiling of the analysis pipelines (their --profile options)"""
+
+import contextlib
+import json
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+
+
+def _max_rss_mb():
+    """Peak resident memory of this process so far in MB, None where unavailable"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class StageProfiler:
+    """Wall time, CPU time and memory per analysis stage
+
+    Each stage records the process' resident memory high-water mark at its
+    end (max_rss_mb), which rises in the stage that needed the most memory so
+    far. `trace_memory` adds the exact peak of the Python/NumPy allocations
+    within each stage (peak_memory_mb) via tracemalloc, at the price of a
+    much slower run. A disabled profiler only runs the wrapped code.
+
+    Stages profiled in worker processes can be appended to `stages` with
+    process='worker'; they count towards the CPU total but not the wall
+    total, as they overlap the stage that waited for them.
+    """
+
+    def __init__(self, enabled=True, trace_memory=False):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.stages = []
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Profile the enclosed block as stage `name`; stages must not be nested"""
+        if not self.enabled:
+            yield
+            return
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            record = {
+                'stage': name,
+                'wall_s': time.perf_counter() - start_wall,
+                'cpu_s': time.process_time() - start_cpu,
+                'max_rss_mb': _max_rss_mb()
+            }
+            if self.trace_memory:
+                record['peak_memory_mb'] = (tracemalloc.get_traced_memory()[1] - start_memory) / 1e6
+            self.stages.append(record)
+
+    def save(self, path, **metadata):
+        """Write all stages with their totals and `metadata` as JSON"""
+        profile = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            **metadata,
+            'trace_memory': self.trace_memory,
+            'max_rss_mb': _max_rss_mb(),
+            'total_wall_s': sum(stage['wall_s'] for stage in self.stages if stage.get('process') != 'worker'),
+            'total_cpu_s': sum(stage['cpu_s'] for stage in self.stages),
+            'stages': self.stages
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(profile, f, indent=2)
@@ -0,0 +1,105 @@
+"""Reading sheets of the source workbooks, and a hash-keyed cache of the frames parsed from them"""
+
+import csv
+import glob
+import hashlib
+import io
+import re
+from datetime import datetime, time as clock_time
+from pathlib import Path
+
+import pandas as pd
+
+
+def _cell_text(value, number_format):
+    """Render a workbook cell the way the German CSV export of the sheet does"""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        fmt = number_format.replace('\\', '').replace('"', '').lower()
+        if 'y' not in fmt and 'h' not in fmt:
+            # Day-month formats hold values such as "17.5" or "3-4" that Excel took for dates
+            parts = {'d': value.day, 'm': value.month}
+            return re.sub(r'([dm])\1?', lambda token: f"{parts[token[1]]:0{len(token[0])}d}", fmt)
+        return value.strftime('%d.%m.%Y')
+    if isinstance(value, clock_time):
+        return value.strftime('%H:%M')
+    if isinstance(value, bool):
+        return str(value).upper()
+    if isinstance(value, (int, float)):
+        decimals = re.search(r'0\.(0+)', number_format)
+        if decimals:
+            text = f"{value:.{len(decimals[1])}f}"
+        elif float(value).is_integer():
+            text = str(int(value))
+        else:
+            text = repr(float(value))
+        return text.replace('.', ',')
+    return str(value)
+
+
+def read_workbook_sheet(path, sheet):
+    """Read one sheet of an .xlsx workbook as CSV text, like the manual export
+
+    The workbook is streamed with openpyxl's read-only reader. Cells are
+    rendered with their number formats and decimal commas, full dates as
+    dd.mm.yyyy, and empty rows at the start and end as well as empty trailing
+    columns are left out, so the CSV loaders can parse the returned buffer.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = [[_cell_text(cell.value, cell.number_format) for cell in row]
+                for row in workbook[sheet].iter_rows()]
+    finally:
+        workbook.close()
+
+    filled = [i for i, row in enumerate(rows) if any(row)]
+    rows = rows[filled[0]:filled[-1] + 1] if filled else []
+    width = max((max(i for i, text in enumerate(row) if text) + 1 for row in rows if any(row)), default=0)
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='\n').writerows((row + [''] * width)[:width] for row in rows)
+    buffer.seek(0)
+    return buffer
+
+
+def file_hash(path):
+    """SHA-256 hex digest of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_cached(loader, path, cache_dir, version, sheet=None, use_cache=True):
+    """Load `path` with `loader`, reusing a cached Parquet copy of the result
+
+    Entries in `cache_dir` are keyed by the source, the loader, the parser
+    `version` (bump it whenever a loader's output changes) and the hash of
+    the file, so any change to the input or the parser invalidates them.
+    Stale entries for the same source and loader are removed on rebuild.
+    With `sheet`, `path` is a workbook and the loader gets that sheet from
+    read_workbook_sheet; an unchanged workbook is then not opened at all.
+    """
+    def load():
+        return loader(read_workbook_sheet(path, sheet) if sheet else path)
+
+    if not use_cache:
+        return load()
+
+    prefix = f"{Path(path).name}{f'.{sheet}' if sheet else ''}.{loader.__name__}"
+    cache_path = Path(cache_dir) / f"{prefix}.v{version}.{file_hash(path)[:16]}.parquet"
+    if cache_path.exists():
+        return pd.read_parquet(cache_path)
+
+    df = load()
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    for stale_path in cache_path.parent.glob(glob.escape(prefix) + '.*.parquet'):
+        stale_path.unlink()
+    try:
+        df.to_parquet(cache_path)
+    except ImportError:
+        print("No Parquet engine installed (pyarrow), skipping the cache.")
+    return df
@@ -0,0 +1,207 @@
+"""
+Benchmark for the tactile sensitivity analysis.
+- Generates a synthetic Berührung + TN-Liste CSV pair of arbitrary size
+- Times the region and gender comparisons against the original per-pair loops
+- Checks that both produce the same comparison tables
+- Runs a size sweep over loading and every analysis step and keeps the timings per commit
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+from tactile_sensitivity_analysis import TactileSensitivityAnalyzer
+
+# Timing and result store shared with the other benchmarks, in labtools/ at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from labtools.benchmark import add_suite_arguments, run_suite, store_results, time_call
+
+# Typical threshold (mm) per body region, in the column order of the Berührung CSV
+REGION_MEANS = {'Handrücken': 15.0, 'Fingerkuppe': 2.0, 'Unterarm': 25.0, 'Rücken': 33.0, 'Handfläche': 6.0}
+
+
+def legacy_compare_body_regions(data, body_regions):
+    """The original per-pair region comparison, kept as reference for the benchmark."""
+    region_data = []
+    for region in body_regions:
+        values = data[region].dropna()
+        region_data.append(values)
+
+    results = []
+    for i in range(len(body_regions)):
+        for j in range(i+1, len(body_regions)):
+            data1 = region_data[i]
+            data2 = region_data[j]
+
+            if len(data1) > 0 and len(data2) > 0:
+                t_stat, p_value = stats.ttest_ind(data1, data2)
+                pooled_std = np.sqrt(((len(data1)-1)*data1.var() + (len(data2)-1)*data2.var()) / (len(data1)+len(data2)-2))
+                cohens_d = (data1.mean() - data2.mean()) / pooled_std
+
+                results.append({
+                    'Region 1': body_regions[i],
+                    'Region 2': body_regions[j],
+                    'Mean 1': data1.mean(),
+                    'Mean 2': data2.mean(),
+                    't-statistic': t_stat,
+                    'p-value': p_value,
+                    'Cohen\'s d': cohens_d,
+                    'Significant': p_value < 0.05
+                })
+    return pd.DataFrame(results)
+
+
+def legacy_compare_genders(data, body_regions):
+    """The original per-region gender comparison, kept as reference for the benchmark."""
+    results = []
+    for region in body_regions:
+        male_data = data[data['Geschlecht'] == 'm'][region].dropna()
+        female_data = data[data['Geschlecht'] == 'w'][region].dropna()
+
+        if len(male_data) > 1 and len(female_data) > 1:
+            t_stat, p_value = stats.ttest_ind(male_data, female_data)
+            pooled_std = np.sqrt(((len(male_data)-1)*male_data.var() + (len(female_data)-1)*female_data.var()) / (len(male_data)+len(female_data)-2))
+            cohens_d = (male_data.mean() - female_data.mean()) / pooled_std
+
+            results.append({
+                'Body Region': region,
+                'Male Mean': male_data.mean(),
+                'Female Mean': female_data.mean(),
+                'Male N': len(male_data),
+                'Female N': len(female_data),
+                't-statistic': t_stat,
+                'p-value': p_value,
+                'Cohen\'s d': cohens_d,
+                'Significant': p_value < 0.05
+            })
+    return pd.DataFrame(results)
+
+
+def _german_decimal(values):
+    """Formats floats the way the lab export does ("1,5" quoted, "10" bare, NaN empty)."""
+    text = pd.Series(values).astype(str).str.replace(r'\.0$', '', regex=True)
+    text = text.where(pd.notna(values), '')
+    return np.where(text.str.contains('.', regex=False), '"' + text.str.replace('.', ',') + '"', text)
+
+
+def generate_tactile_csvs(data_dir, n_participants, seed=0):
+    """Writes a synthetic Berührung + TN-Liste CSV pair for `n_participants`.
+
+    Participants come in course groups of 8 to 16 people keyed by Datum,
+    Stdgang and Person like the real export. The thresholds are skewed,
+    rounded to quarter millimetres, and the back is only measured in about
+    half of the groups. The TN-Liste has the unnamed empty columns and a few
+    participants without gender, as in the real files.
+    """
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(8, 17, size=max(1, n_participants // 12))
+    sizes = sizes[np.cumsum(sizes) <= max(n_participants, sizes[0])]
+    n = int(sizes.sum())
+    group = np.repeat(np.arange(len(sizes)), sizes)
+    person = np.arange(n) - np.repeat(np.cumsum(sizes) - sizes, sizes) + 1
+
+    groups = pd.Series(np.arange(len(sizes)))
+    years = 2015 + groups // 12
+    datum = ((groups % 28 + 1).astype(str).str.zfill(2) + '.' + (groups % 12 + 1).astype(str).str.zfill(2) + '.'
+             + years.astype(str)).to_numpy()[group]
+    stdgang = ('MBI' + (years - 2001).astype(str) + '_Grp' + (groups % 4 + 1).astype(str)).to_numpy()[group]
+
+    gender = rng.choice(['m', 'w', ''], size=n, p=[0.48, 0.48, 0.04])
+    measurements = pd.DataFrame({'Datum': datum, 'Stdgang': stdgang, 'Person': person})
+    for region, mean in REGION_MEANS.items():
+        values = np.round(rng.lognormal(np.log(mean), 0.45, size=n) * 4) / 4
+        if region == 'Rücken':
+            values = np.where((rng.random(len(sizes)) < 0.5)[group], values, np.nan)
+        measurements[region] = _german_decimal(values)
+
+    participants = pd.DataFrame({
+        'Datum': datum,
+        'Stdgang': stdgang,
+        'Person': person,
+        'Alter': rng.integers(18, 36, size=n),
+        'Geschlecht': gender,
+        '': '',
+        ' ': '',
+        'Raucher': rng.choice(['0', '1', '2', 'n', ''], size=n),
+        'Brillenträger': rng.choice(['j', 'n'], size=n),
+        'Dioptrien li': '',
+        'Dioptrien re': '',
+        'Sportler': ''
+    })
+
+    with open(os.path.join(data_dir, 'UE_Sinne_Ergebnisse-Berührung.csv'), 'w', encoding='utf-8', newline='') as f:
+        f.write(','.join(measurements.columns) + '\n')
+        columns = [measurements[col].astype(str) for col in measurements.columns]
+        f.write('\n'.join(columns[0].str.cat(columns[1:], sep=',')) + '\n')
+    participants.to_csv(os.path.join(data_dir, 'UE_Sinne_Ergebnisse-TN-Liste.csv'), index=False)
+    return n
+
+
+def benchmark_comparisons(n_participants):
+    """Times the region and gender comparisons against the original loops."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        n, gen_time = time_call(generate_tactile_csvs, tmp_dir, n_participants)
+        print(f"Generated {n:,} participants in {gen_time:.1f}s")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            analyzer, load_time = time_call(TactileSensitivityAnalyzer, data_dir=tmp_dir, output_dir=tmp_dir)
+        print(f"Load and preprocess: {load_time:8.3f}s")
+
+        for name, method, legacy in [('Region comparisons', analyzer.compare_body_regions, legacy_compare_body_regions),
+                                     ('Gender comparisons', analyzer.compare_genders, legacy_compare_genders)]:
+            with contextlib.redirect_stdout(io.StringIO()):
+                result, new_time = time_call(method)
+            expected, legacy_time = time_call(legacy, analyzer.data, analyzer.body_regions)
+            pd.testing.assert_frame_equal(result, expected, check_dtype=False, rtol=1e-9)
+            print(f"{name}: {new_time:8.3f}s (legacy {legacy_time:.3f}s, {legacy_time / new_time:.1f}x)")
+
+
+def benchmark_suite(sizes, repeat=1, figures=False):
+    """Times loading and each analysis step of the analyzer per number of participants.
+
+    The steps run in the order of run_complete_analysis; figures are only
+    rendered with `figures`. The best of `repeat` runs is kept.
+    """
+    def setup(tmp_dir, n_participants):
+        return f"{generate_tactile_csvs(tmp_dir, n_participants):,} generated"
+
+    def steps(tmp_dir):
+        analyzer, load_time = time_call(TactileSensitivityAnalyzer, data_dir=tmp_dir, output_dir=tmp_dir)
+        methods = [analyzer.descriptive_statistics, analyzer.compare_body_regions,
+                   analyzer.compare_genders, analyzer.correlations, analyzer.generate_report]
+        if figures:
+            methods.insert(4, analyzer.create_visualizations)
+        return [('load_data', load_time)] + [(method.__name__, time_call(method)[1]) for method in methods]
+
+    return run_suite(sizes, setup, steps, repeat=repeat, unit='participants')
+
+
+def main():
+    """Main function to run the benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark the tactile sensitivity comparisons on synthetic data')
+    parser.add_argument('--participants', type=int, default=1_000_000,
+                        help='Approximate number of participants in the synthetic CSVs (default: %(default)s)')
+    add_suite_arguments(parser, 'Time load_data and every analysis method over --sizes instead of comparing '
+                                'against the original loops', 'Numbers of participants')
+    parser.add_argument('--figures', action='store_true',
+                        help='Include create_visualizations in --suite')
+    args = parser.parse_args()
+
+    if args.suite:
+        store_results(benchmark_suite(args.sizes, repeat=args.repeat, figures=args.figures), args)
+        return
+
+    benchmark_comparisons(args.participants)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,65 +5,883 @@ Analyzes surface sensitivity (tactile perception) data from compass experiments
 measuring the resolving power of mechanical touch receptors on different body parts.
 """
 
+import os
+import io
+import sys
+import json
+import time
+import contextlib
+import hashlib
+import platform
+from datetime import datetime
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import scipy.stats as stats
+from scipy import special
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 import warnings
 warnings.filterwarnings('ignore')
 
-# Set style for better plots
-plt.style.use('seaborn-v0_8')
-sns.set_palette("husl")
+# Helpers shared with the other analyses, in labtools/ at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from labtools.bundle import read_bundle, write_bundle
+from labtools.profiling import StageProfiler
+from labtools.workbook import load_cached
+
+# Body regions measured in the experiment, German column names and English names
+BODY_REGIONS_DE = ['Handrücken', 'Fingerkuppe', 'Unterarm', 'Rücken', 'Handfläche']
+BODY_REGIONS_EN = ['Hand Back', 'Fingertip', 'Forearm', 'Back', 'Palm']
+
+# Columns read from the two CSVs and their dtypes. Datum is kept as a category
+# of labels since older courses only record the year, Person is float because of
+# blank lines, the code columns are categories and the distances (decimal
+# commas) are parsed while reading, see read_measurements
+JOIN_KEYS = ['Datum', 'Stdgang', 'Person']
+MEASUREMENT_DTYPES = {'Datum': 'category', 'Stdgang': 'category', 'Person': 'float64',
+                      **{region: 'float64' for region in BODY_REGIONS_DE}}
+PARTICIPANT_DTYPES = {'Datum': 'category', 'Stdgang': 'category', 'Person': 'float64', 'Alter': 'float64',
+                      'Geschlecht': 'category', 'Raucher': 'category', 'Brillenträger': 'category',
+                      'Dioptrien li': 'str', 'Dioptrien re': 'str', 'Sportler': 'str'}
+
+# Rows of the Berührung CSV parsed at a time by read_measurements
+MEASUREMENT_CHUNK_ROWS = 100000
+
+# Master workbook in the data directory the two CSVs are exported from, its
+# sheets, and the cache of parsed sheets (bump the parser version whenever a
+# reader's output changes, so cached sheets are rebuilt)
+WORKBOOK_FILE = 'UE_Sinne_Ergebnisse.xlsx'
+MEASUREMENT_SHEET = 'Berührung'
+PARTICIPANT_SHEET = 'TN-Liste'
+CACHE_DIR = 'cache'
+PARSER_VERSION = 1
+
+# State of update_descriptive_statistics in the output directory, and how much
+# of the already absorbed CSV is compared to detect edits before appended rows
+STATE_FILE = 'descriptive_statistics_state.json'
+FINGERPRINT_BYTES = 4096
+
+# Output resolution presets for the figures (dots per inch)
+RESOLUTION_PRESETS = {'draft': 72, 'screen': 150, 'print': 300}
+FIGURE_FORMATS = ['png', 'pdf', 'svg']
+FIGURE_NAMES = ['body_regions_boxplot', 'gender_comparison', 'correlation_heatmap', 'distributions']
+
+# Single-file results bundle (--bundle) in the output directory
+BUNDLE_FILE = 'results.parquet'
+
+
+def read_measurements(source, chunksize=MEASUREMENT_CHUNK_ROWS):
+    """Read a Berührung CSV (path or buffer) with the MEASUREMENT_DTYPES columns
+    
+    The file is read `chunksize` rows at a time, so only one chunk of raw
+    text is held at once. The parser reads the distances with decimal commas
+    itself; a chunk's column that also holds decimal points or text is
+    converted after replacing the commas, with invalid entries becoming NaN.
+    Rows without any distance are dropped per chunk, and the key categories
+    of all chunks are united at the end. An empty or header-only file gives
+    an empty frame with the same columns.
+    """
+    keys = {key: MEASUREMENT_DTYPES[key] for key in JOIN_KEYS}
+    chunks = []
+    try:
+        with pd.read_csv(source, usecols=list(MEASUREMENT_DTYPES), dtype=keys, decimal=',',
+                         chunksize=chunksize) as reader:
+            for chunk in reader:
+                for region in BODY_REGIONS_DE:
+                    if not pd.api.types.is_numeric_dtype(chunk[region]):
+                        chunk[region] = pd.to_numeric(chunk[region].str.replace(',', '.'), errors='coerce')
+                chunks.append(chunk.astype(MEASUREMENT_DTYPES).dropna(subset=BODY_REGIONS_DE, how='all'))
+    except pd.errors.EmptyDataError:
+        pass
+    if not chunks:
+        return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in MEASUREMENT_DTYPES.items()})
+    
+    # The same sorted categories for every chunk keep the concatenated keys categorical
+    for column in [column for column, dtype in MEASUREMENT_DTYPES.items() if dtype == 'category']:
+        categories = pd.Index(sorted(set().union(*(chunk[column].cat.categories for chunk in chunks))))
+        for chunk in chunks:
+            chunk[column] = chunk[column].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def read_participants(source):
+    """Read a TN-Liste CSV with the PARTICIPANT_DTYPES columns, skipping the unnamed empty ones"""
+    return pd.read_csv(source, usecols=list(PARTICIPANT_DTYPES), dtype=PARTICIPANT_DTYPES)
+
+
+def encode_keys(left, right, keys):
+    """Encode the composite key of two frames as one compact integer code per row
+    
+    Every key column is factorized per frame, and only the unique values are
+    matched up between the frames. The key codes are folded into the running
+    code, which is factorized again so the codes stay dense. Missing key
+    values get a code of their own, as in pd.merge.
+    """
+    n_left = len(left)
+    codes = np.zeros(n_left + len(right), dtype=np.int64)
+    for key in keys:
+        left_codes, left_uniques = pd.factorize(left[key], use_na_sentinel=False)
+        right_codes, right_uniques = pd.factorize(right[key], use_na_sentinel=False)
+        shared_codes, shared = pd.factorize(pd.Index(left_uniques).append(pd.Index(right_uniques)),
+                                            use_na_sentinel=False)
+        key_codes = np.concatenate([shared_codes[:len(left_uniques)][left_codes],
+                                    shared_codes[len(left_uniques):][right_codes]])
+        codes, _ = pd.factorize(codes * len(shared) + key_codes)
+    return codes[:n_left], codes[n_left:]
+
+
+def indexed_left_join(left, right, keys):
+    """Left join `right` onto `left` through a sorted index of the encoded keys
+    
+    Gives the same rows, in the same order, as pd.merge(how='left'): a left row
+    matching several right rows is repeated, and unmatched left rows get missing
+    values. Rows whose keys are all missing (blank lines) are dropped first.
+    Returns the joined frame and a dict with the number of left rows, unmatched
+    left rows, duplicated left and right keys and left rows with several matches.
+    """
+    left = left.dropna(subset=keys, how='all').reset_index(drop=True)
+    right = right.dropna(subset=keys, how='all').reset_index(drop=True)
+    left_codes, right_codes = encode_keys(left, right, keys)
+    
+    order = np.argsort(right_codes, kind='stable')
+    index = right_codes[order]
+    start = np.searchsorted(index, left_codes, side='left')
+    matches = np.searchsorted(index, left_codes, side='right') - start
+    
+    # One output row per match, or one row with missing values if unmatched
+    repeats = np.maximum(matches, 1)
+    left_rows = np.repeat(np.arange(len(left)), repeats)
+    within = np.arange(len(left_rows)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+    matched = np.repeat(matches > 0, repeats)
+    right_rows = np.full(len(left_rows), -1)
+    right_rows[matched] = order[np.repeat(start, repeats)[matched] + within[matched]]
+    
+    joined = pd.concat([left.take(left_rows).reset_index(drop=True),
+                        right.drop(columns=keys).reindex(right_rows).reset_index(drop=True)], axis=1)
+    report = {
+        'rows': len(left),
+        'unmatched': int((matches == 0).sum()),
+        'duplicated_left_keys': int(pd.Series(left_codes).duplicated().sum()),
+        'duplicated_right_keys': int(pd.Series(right_codes).duplicated().sum()),
+        'multiple_matches': int((matches > 1).sum()),
+    }
+    return joined, report
+
+
+def cell_statistics(long_data, keys):
+    """Sufficient statistics of the distances per cell of `keys`
+    
+    Returns a DataFrame indexed by the observed key combinations with the
+    count n, the mean and M2 (the sum of squared deviations from the mean).
+    """
+    grouped = long_data.groupby(keys, observed=True)['Distance (mm)'].agg(['count', 'mean', 'var'])
+    n = grouped['count'].to_numpy(dtype=float)
+    return pd.DataFrame({
+        'n': n,
+        'mean': grouped['mean'].to_numpy(),
+        'm2': np.where(n > 1, grouped['var'].to_numpy() * (n - 1), 0.0)
+    }, index=grouped.index)
+
+
+def merge_statistics(cells, by):
+    """Pool the cells of cell_statistics over all index levels except `by`
+    
+    Uses the parallel update of Chan et al.: the pooled M2 is the sum of the
+    cell M2s plus the spread of the cell means around the pooled mean.
+    """
+    weighted_sum = cells['n'] * cells['mean']
+    totals = weighted_sum.groupby(level=by, observed=True)
+    mean = totals.transform('sum') / cells['n'].groupby(level=by, observed=True).transform('sum')
+    pooled = pd.DataFrame({
+        'n': cells['n'],
+        'mean': weighted_sum,
+        'm2': cells['m2'] + cells['n'] * (cells['mean'] - mean) ** 2
+    }).groupby(level=by, observed=True).sum()
+    pooled['mean'] /= pooled['n']
+    return pooled
+
+
+def two_sample_tests(n1, mean1, m2_1, n2, mean2, m2_2):
+    """Independent two-sample t-tests from sufficient statistics, vectorized over pairs
+    
+    Returns a dict of arrays with Student's t-test (t, p), Welch's t-test
+    (t_welch, df_welch, p_welch) and Cohen's d with the pooled standard deviation.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        diff = mean1 - mean2
+        df = n1 + n2 - 2
+        pooled_var = (m2_1 + m2_2) / df
+        t = diff / np.sqrt(pooled_var * (1 / n1 + 1 / n2))
+        
+        se1, se2 = m2_1 / (n1 - 1) / n1, m2_2 / (n2 - 1) / n2
+        t_welch = diff / np.sqrt(se1 + se2)
+        df_welch = (se1 + se2) ** 2 / (se1 ** 2 / (n1 - 1) + se2 ** 2 / (n2 - 1))
+        
+        return {
+            't': t,
+            'p': 2 * special.stdtr(df, -np.abs(t)),
+            't_welch': t_welch,
+            'df_welch': df_welch,
+            'p_welch': 2 * special.stdtr(df_welch, -np.abs(t_welch)),
+            'cohens_d': diff / np.sqrt(pooled_var)
+        }
+
+
+def paired_tests(matrix):
+    """Paired t-tests between all column pairs of a participants x regions matrix
+    
+    Missing values (NaN) are allowed; every pair uses the participants measured
+    on both regions. The sums of the differences and their squares are taken
+    from cross products of the (centered) matrix, so all pairs are computed in
+    a few matrix multiplications. Returns the pair indices (i < j) and a dict of
+    arrays with n, mean difference, t, p and Cohen's d_z.
+    """
+    measured = ~np.isnan(matrix)
+    with np.errstate(invalid='ignore'):
+        centers = np.nanmean(matrix, axis=0)
+    centered = np.where(measured, matrix - centers, 0.0)
+    weights = measured.astype(float)
+    
+    n = weights.T @ weights
+    sums = centered.T @ weights
+    squares = (centered ** 2).T @ weights
+    cross = centered.T @ centered
+    
+    i, j = np.triu_indices(matrix.shape[1], k=1)
+    n = n[i, j]
+    # Differences of the centered values, shifted back by the difference of the centers
+    diff_sum = sums[i, j] - sums[j, i]
+    diff_m2 = squares[i, j] + squares[j, i] - 2 * cross[i, j] - diff_sum ** 2 / np.where(n > 0, n, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_diff = diff_sum / n + centers[i] - centers[j]
+        sd = np.sqrt(np.maximum(diff_m2, 0) / (n - 1))
+        t = mean_diff / (sd / np.sqrt(n))
+        p = 2 * special.stdtr(n - 1, -np.abs(t))
+        return i, j, {'n': n, 'mean_diff': mean_diff, 't': t, 'p': p, 'cohens_d': mean_diff / sd}
+
+
+def describe_distances(long_data, keys=('Body Region',), percentiles=(0.25, 0.75)):
+    """Descriptive statistics of the distances per combination of the categorical `keys`
+    
+    Sorting by group and distance makes every group a contiguous sorted
+    slice, so np.add.reduceat gives the two-pass mean and std of all groups
+    at once, and n, min, max, the median and all `percentiles` follow by index
+    arithmetic; the percentiles interpolate linearly as Series.quantile.
+    Returns a table with the columns n, mean, median, std, min, max and
+    q<percent> for every percentile, indexed by the observed key combinations.
+    """
+    # One code per combination of the categorical keys; rows with a missing key
+    # (e.g. no age) belong to no group, as in groupby
+    keys = list(keys)
+    codes = [long_data[key].cat.codes.to_numpy() for key in keys]
+    n_categories = [len(long_data[key].cat.categories) for key in keys]
+    valid = np.logical_and.reduce([key_codes >= 0 for key_codes in codes])
+    combined = np.zeros(valid.sum(), dtype=np.int64)
+    for key_codes, n_key in zip(codes, n_categories):
+        combined = combined * n_key + key_codes[valid]
+    counts = np.bincount(combined, minlength=int(np.prod(n_categories)))
+    observed = np.flatnonzero(counts)
+    group = (np.cumsum(counts > 0) - 1)[combined]
+    distance = long_data['Distance (mm)'].to_numpy(dtype=float)[valid]
+    
+    n = counts[observed]
+    start = np.cumsum(n) - n
+    # Sorted by distance, then stably by group (narrow codes take numpy's radix sort)
+    by_value = np.argsort(distance)
+    ordered = distance[by_value[np.argsort(group[by_value].astype(np.min_scalar_type(len(n))), kind='stable')]]
+    mean = np.add.reduceat(ordered, start) / n
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std = np.sqrt(np.add.reduceat((ordered - np.repeat(mean, n)) ** 2, start) / (n - 1))
+    std[n == 1] = np.nan
+    
+    table = {
+        'n': n.astype(float),
+        'mean': mean,
+        'median': (ordered[start + (n - 1) // 2] + ordered[start + n // 2]) / 2,
+        'std': std,
+        'min': ordered[start],
+        'max': ordered[start + n - 1],
+    }
+    for q in percentiles:
+        position = (n - 1) * q
+        below = np.floor(position).astype(int)
+        above = np.minimum(below + 1, n - 1)
+        low, high = ordered[start + below], ordered[start + above]
+        fraction = position - below
+        # np.percentile's interpolation, from the nearer of the two neighbours
+        table[f'q{q * 100:g}'] = np.where(fraction >= 0.5, high - (high - low) * (1 - fraction),
+                                          low + (high - low) * fraction)
+    
+    levels = [pd.Categorical.from_codes(level_codes, dtype=long_data[key].dtype)
+              for key, level_codes in zip(keys, np.unravel_index(observed, n_categories))]
+    index = pd.MultiIndex.from_arrays(levels, names=keys) if len(keys) > 1 else pd.CategoricalIndex(levels[0], name=keys[0])
+    return pd.DataFrame(table, index=index)
+
+
+def _mean_differences(is_male, values, measured):
+    """Male minus female mean of every region for each row of label assignments"""
+    male_sum = is_male @ values
+    male_n = is_male @ measured
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return male_sum / male_n - (values.sum(axis=0) - male_sum) / (measured.sum(axis=0) - male_n)
+
+
+def _permutation_batch(values, measured, is_male, observed, size, seed):
+    """Count the label permutations with a mean difference at least as extreme as observed"""
+    rng = np.random.default_rng(seed)
+    permuted = rng.permuted(np.tile(is_male, (size, 1)), axis=1)
+    differences = _mean_differences(permuted, values, measured)
+    # Relative tolerance so that ties of the integer-valued data are not lost to rounding
+    return (np.abs(differences) >= np.abs(observed) * (1 - 1e-9)).sum(axis=0)
+
+
+def permutation_test(matrix, is_male, n_permutations=100000, seed=0, batch_size=10000, workers=1, precision=None):
+    """Two-sided permutation test of the male/female mean difference per region
+    
+    `matrix` is participants x regions (NaN where not measured) and `is_male`
+    the gender of each participant. The gender labels are permuted in batches
+    of `batch_size` permutations that are evaluated for all regions at once;
+    batch i always uses the i-th child of SeedSequence(seed), so the result is
+    reproducible for any number of `workers` processes (0 uses all CPU cores).
+    With `precision`, testing stops after the first batch at which the 95%
+    confidence half-width of every p-value is below it.
+    
+    Returns the p-values ((exceedances + 1) / (permutations + 1)), the observed
+    mean differences and the number of permutations used.
+    """
+    measured = ~np.isnan(matrix)
+    values = np.where(measured, matrix, 0.0)
+    measured = measured.astype(float)
+    is_male = np.asarray(is_male, dtype=float)
+    observed = _mean_differences(is_male[None, :], values, measured)[0]
+    
+    n_batches = -(-n_permutations // batch_size)
+    sizes = [min(batch_size, n_permutations - i * batch_size) for i in range(n_batches)]
+    seeds = np.random.SeedSequence(seed).spawn(n_batches)
+    args = (values, measured, is_male, observed)
+    
+    workers = workers or os.cpu_count()
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 and n_batches > 1 else None
+    exceedances, done = np.zeros(matrix.shape[1]), 0
+    try:
+        # Rounds of one batch per worker; the stopping rule is checked batch by batch in order
+        for start in range(0, n_batches, workers):
+            batches = range(start, min(start + workers, n_batches))
+            if pool is None:
+                counts = (_permutation_batch(*args, sizes[i], seeds[i]) for i in batches)
+            else:
+                counts = [future.result() for future in
+                          [pool.submit(_permutation_batch, *args, sizes[i], seeds[i]) for i in batches]]
+            for i, count in zip(batches, counts):
+                exceedances += count
+                done += sizes[i]
+                p_values = (exceedances + 1) / (done + 1)
+                if precision is not None and np.all(1.96 * np.sqrt(p_values * (1 - p_values) / done) < precision):
+                    return p_values, observed, done
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return p_values, observed, done
+
+
+def _pair_values(matrix, first, second):
+    """Distinct value pairs of the region pairs (first[k], second[k]) and how often they occur
+    
+    One np.unique over (pair, x level, y level) keys of the rows measured on
+    both regions of a pair. Returns the pair, x, y and count of every distinct
+    value pair as flat arrays, sorted by pair, then x, then y.
+    """
+    levels, codes = np.unique(matrix, return_inverse=True)
+    codes = codes.reshape(matrix.shape)
+    n_levels = len(levels)
+    both = ~np.isnan(matrix[:, first]) & ~np.isnan(matrix[:, second])
+    keys = (np.arange(len(first)) * n_levels + codes[:, first]) * n_levels + codes[:, second]
+    keys, counts = np.unique(keys[both], return_counts=True)
+    return keys // n_levels**2, levels[keys // n_levels % n_levels], levels[keys % n_levels], counts
+
+
+def _tie_groups(pair, values):
+    """Tie groups of `values` within each pair
+    
+    Returns the order that sorts the entries by pair and value, the first
+    sorted position of every group, the group of every entry and the first
+    group of every pair present.
+    """
+    order = np.lexsort((values, pair))
+    ordered_pair, ordered = pair[order], values[order]
+    new_group = np.r_[True, (ordered_pair[1:] != ordered_pair[:-1]) | (ordered[1:] != ordered[:-1])]
+    starts = np.flatnonzero(new_group)
+    group = np.empty(len(order), dtype=np.int64)
+    group[order] = np.cumsum(new_group) - 1
+    group_pair = ordered_pair[starts]
+    return order, starts, group, np.flatnonzero(np.r_[True, group_pair[1:] != group_pair[:-1]])
+
+
+def _group_ranks(group_weights, pair_starts):
+    """Mid-ranks of the tie groups within their pair in every row of `group_weights`
+    
+    A group with weight w takes w consecutive ranks, and its members share the
+    mean of them.
+    """
+    cumulative = np.cumsum(group_weights, axis=1)
+    before = np.zeros((len(group_weights), len(pair_starts)))
+    before[:, 1:] = cumulative[:, pair_starts[1:] - 1]
+    sizes = np.diff(np.r_[pair_starts, group_weights.shape[1]])
+    return cumulative - np.repeat(before, sizes, axis=1) - (group_weights - 1) / 2
+
+
+def _correlation(n, sx, sy, sxx, syy, sxy):
+    """Correlation from the sums of x, y, their squares and their products"""
+    var_x, var_y = sxx - sx**2 / n, syy - sy**2 / n
+    # A constant variable (up to rounding) has no correlation
+    constant = (var_x <= 1e-12 * sxx) | (var_y <= 1e-12 * syy)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlation = (sxy - sx * sy / n) / np.sqrt(var_x * var_y)
+    return np.where(constant, np.nan, np.clip(correlation, -1, 1))
+
+
+def _pair_correlations(weights, x, y, x_ties, y_ties):
+    """Pearson and Spearman correlation of every present pair in every row of `weights`
+    
+    `weights` holds how often each distinct value pair (see _pair_values)
+    occurs in each sample. The sums and ranks are reduced per tie group of x
+    and y; only the cross products touch every value pair. Returns an array
+    of 2 (Pearson, Spearman) x samples x pairs.
+    """
+    _, x_starts, _, x_pairs = x_ties
+    y_order, y_starts, y_group, y_pairs = y_ties
+    # The value pairs are sorted by pair and x, so every x tie group is contiguous
+    x_weights = np.add.reduceat(weights, x_starts, axis=1)
+    y_weights = np.add.reduceat(weights[:, y_order], y_starts, axis=1)
+    x_levels, y_levels = x[x_starts], y[y_order][y_starts]
+    x_ranks, y_ranks = _group_ranks(x_weights, x_pairs), _group_ranks(y_weights, y_pairs)
+    
+    n = np.add.reduceat(x_weights, x_pairs, axis=1)
+    correlations = []
+    for x_values, y_values, y_by_pair in [(x_levels, y_levels, weights * y),
+                                          (x_ranks, y_ranks, weights * y_ranks[:, y_group])]:
+        cross = np.add.reduceat(y_by_pair, x_starts, axis=1) * x_values
+        correlations.append(_correlation(
+            n, np.add.reduceat(x_weights * x_values, x_pairs, axis=1), np.add.reduceat(y_weights * y_values, y_pairs, axis=1),
+            np.add.reduceat(x_weights * x_values**2, x_pairs, axis=1), np.add.reduceat(y_weights * y_values**2, y_pairs, axis=1),
+            np.add.reduceat(cross, x_pairs, axis=1)))
+    return np.stack(correlations)
+
+
+def _resample_counts(pair, counts, n, size, rng):
+    """How often each distinct value pair occurs in each of `size` bootstrap resamples
+    
+    The rows of every region pair are resampled on their own. Drawing the rows
+    one by one is cheaper than the per-value-pair binomials of a multinomial
+    draw, unless the rows far outnumber the distinct value pairs.
+    """
+    n_entries = len(counts)
+    if counts.sum() < 16 * n_entries:
+        owner = np.repeat(np.arange(n_entries), counts)
+        row_pair = pair[owner]
+        # Row i of a pair with n rows is drawn as floor(u * n) for uniform u in [0, 1)
+        offsets = (rng.random((size, len(owner))) * n[row_pair]).astype(np.int64)
+        draws = owner[(np.cumsum(n) - n)[row_pair] + offsets]
+        draws += n_entries * np.arange(size)[:, None]
+        return np.bincount(draws.ravel(), minlength=size * n_entries).reshape(size, n_entries).astype(float)
+    n_values = np.bincount(pair, minlength=len(n))
+    slot = np.arange(n_entries) - (np.cumsum(n_values) - n_values)[pair]
+    probabilities = np.zeros((len(n), n_values.max()))
+    probabilities[pair, slot] = counts / n[pair]
+    probabilities[n == 0, 0] = 1
+    return rng.multinomial(n, probabilities, size=(size, len(n)))[:, pair, slot].astype(float)
+
+
+def correlation_table(matrix, body_regions, n_bootstrap=1000, seed=0, confidence=0.95, batch_size=None):
+    """Pearson and Spearman correlation of every pair of regions
+    
+    `matrix` is participants x regions (NaN where not measured); every pair
+    uses the participants measured on both (pairwise-complete), and Spearman
+    ranks within them as pandas does. The p-values use the t distribution.
+    
+    All pairs are reduced to their distinct value pairs and counts at once,
+    so the cost grows with the number of distinct thresholds rather than
+    participants, and each sample is evaluated for all pairs together. With
+    `n_bootstrap` > 0, percentile bootstrap intervals at `confidence` are
+    added: a resample gives new counts (see _resample_counts), and batches of
+    `batch_size` resamples (default: about 4M draws per batch) are evaluated
+    at once. Batch i uses child i of SeedSequence(seed).
+    """
+    first, second = np.triu_indices(len(body_regions), k=1)
+    pair, x, y, counts = _pair_values(matrix - np.nanmean(matrix, axis=0), first, second)
+    n = np.bincount(pair, weights=counts, minlength=len(first)).astype(int)
+    present = np.unique(pair)
+    ties = _tie_groups(pair, x), _tie_groups(pair, y)
+    
+    estimates = np.full((2, 1 + n_bootstrap, len(first)), np.nan)
+    if len(counts):
+        estimates[:, :1, present] = _pair_correlations(counts[None].astype(float), x, y, *ties)
+        size = batch_size or max(1, 2**22 // min(counts.sum(), 16 * len(counts)))
+        for batch, batch_seed in enumerate(np.random.SeedSequence(seed).spawn(-(-n_bootstrap // size))):
+            first_sample, last_sample = 1 + batch * size, 1 + min(n_bootstrap, (batch + 1) * size)
+            weights = _resample_counts(pair, counts, n, last_sample - first_sample, np.random.default_rng(batch_seed))
+            estimates[:, first_sample:last_sample, present] = _pair_correlations(weights, x, y, *ties)
+    estimates[:, :, n <= 1] = np.nan
+    
+    regions = np.asarray(body_regions, dtype=object)
+    table = {'Region 1': regions[first], 'Region 2': regions[second], 'N': n}
+    alpha = (1 - confidence) / 2
+    for (method, statistic), (estimate, *resamples) in zip([('Pearson', 'r'), ('Spearman', 'rho')], estimates):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = estimate * np.sqrt((n - 2) / (1 - estimate**2))
+        table[f'{method} {statistic}'] = estimate
+        table[f'{method} p-value'] = 2 * special.stdtr(n - 2, -np.abs(t))
+        if n_bootstrap > 0:
+            table[f'{method} CI low'], table[f'{method} CI high'] = np.nanquantile(resamples, [alpha, 1 - alpha], axis=0)
+    
+    table = pd.DataFrame(table)
+    if n_bootstrap > 0:
+        table['Bootstrap resamples'] = n_bootstrap
+    return table
+
+
+class OnlineStatistics:
+    """Mergeable running statistics of the distances per body region and gender
+    
+    Every (region, gender) cell keeps Welford's running moments (n, mean, M2)
+    plus min and max, and a quantile sketch: the count of every distinct value
+    rounded to `resolution` mm. The sketch is exact for thresholds recorded
+    with that precision and is merged by adding counts, so states built from
+    separate row batches or cohorts combine without the raw data.
+    """
+    
+    def __init__(self, resolution=0.01):
+        self.scale = int(round(1 / resolution))
+        self.cells = {}
+        
+    def update(self, long_data):
+        """Absorb the rows of a long measurement table (see build_long_table)"""
+        keys = ['Body Region', 'Geschlecht']
+        long_data = long_data.assign(Step=np.round(long_data['Distance (mm)'].to_numpy() * self.scale).astype(np.int64))
+        grouped = long_data.groupby(keys, observed=True)['Distance (mm)'].agg(['count', 'mean', 'var', 'min', 'max'])
+        counts = long_data.groupby(keys + ['Step'], observed=True).size()
+        
+        for key, row in grouped.iterrows():
+            n = float(row['count'])
+            sketch = counts.loc[key]
+            self._merge_cell(tuple(str(k) for k in key), {
+                'n': n,
+                'mean': row['mean'],
+                'm2': row['var'] * (n - 1) if n > 1 else 0.0,
+                'min': row['min'],
+                'max': row['max'],
+                'steps': sketch.index.to_numpy(dtype=np.int64),
+                'counts': sketch.to_numpy(dtype=np.int64)
+            })
+        return self
+        
+    def merge(self, other):
+        """Merge another state (e.g. of a separate cohort) into this one"""
+        if other.scale != self.scale:
+            raise ValueError(f"Cannot merge sketches with resolutions 1/{self.scale} and 1/{other.scale} mm")
+        for key, cell in other.cells.items():
+            self._merge_cell(key, cell)
+        return self
+        
+    def _merge_cell(self, key, cell):
+        """Combine the moments (Chan et al.) and the sketch of one cell"""
+        if key not in self.cells:
+            self.cells[key] = dict(cell)
+            return
+        
+        current = self.cells[key]
+        n = current['n'] + cell['n']
+        delta = cell['mean'] - current['mean']
+        steps, inverse = np.unique(np.concatenate([current['steps'], cell['steps']]), return_inverse=True)
+        self.cells[key] = {
+            'n': n,
+            'mean': current['mean'] + delta * cell['n'] / n,
+            'm2': current['m2'] + cell['m2'] + delta ** 2 * current['n'] * cell['n'] / n,
+            'min': min(current['min'], cell['min']),
+            'max': max(current['max'], cell['max']),
+            'steps': steps,
+            'counts': np.bincount(inverse, weights=np.concatenate([current['counts'], cell['counts']])).astype(np.int64)
+        }
+        
+    def region_cell(self, region):
+        """The cell of `region` pooled over all genders, or None if never measured"""
+        pooled = OnlineStatistics(resolution=1 / self.scale)
+        for (cell_region, _), cell in self.cells.items():
+            if cell_region == region:
+                pooled._merge_cell(region, cell)
+        return pooled.cells.get(region)
+        
+    def quantiles(self, cell, q):
+        """Quantiles of a cell with the linear interpolation of pandas/numpy"""
+        position = np.asarray(q) * (cell['n'] - 1)
+        cumulative = np.cumsum(cell['counts'])
+        values = cell['steps'] / self.scale
+        lower = values[np.searchsorted(cumulative, np.floor(position), side='right')]
+        upper = values[np.searchsorted(cumulative, np.ceil(position), side='right')]
+        return lower + (upper - lower) * (position - np.floor(position))
+        
+    def descriptive_table(self, body_regions):
+        """Descriptive statistics per body region in the layout of descriptive_statistics.csv"""
+        stats_dict = {}
+        for region in body_regions:
+            cell = self.region_cell(region)
+            if cell is not None:
+                median, q25, q75 = self.quantiles(cell, [0.5, 0.25, 0.75])
+                stats_dict[region] = {
+                    'n': cell['n'],
+                    'mean': cell['mean'],
+                    'median': median,
+                    'std': np.sqrt(cell['m2'] / (cell['n'] - 1)) if cell['n'] > 1 else np.nan,
+                    'min': cell['min'],
+                    'max': cell['max'],
+                    'q25': q25,
+                    'q75': q75
+                }
+        return pd.DataFrame(stats_dict).T
+        
+    def to_dict(self):
+        """JSON-serializable representation of the state"""
+        return {
+            'resolution_steps_per_mm': self.scale,
+            'cells': [{'region': region, 'gender': gender, 'n': cell['n'], 'mean': cell['mean'],
+                       'm2': cell['m2'], 'min': cell['min'], 'max': cell['max'],
+                       'steps': cell['steps'].tolist(), 'counts': cell['counts'].tolist()}
+                      for (region, gender), cell in self.cells.items()]
+        }
+        
+    @classmethod
+    def from_dict(cls, state):
+        """Rebuild a state from to_dict's representation"""
+        online = cls(resolution=1 / state['resolution_steps_per_mm'])
+        for cell in state['cells']:
+            online.cells[(cell['region'], cell['gender'])] = {
+                'n': cell['n'], 'mean': cell['mean'], 'm2': cell['m2'], 'min': cell['min'], 'max': cell['max'],
+                'steps': np.array(cell['steps'], dtype=np.int64), 'counts': np.array(cell['counts'], dtype=np.int64)
+            }
+        return online
+
+
+# matplotlib.pyplot and seaborn, imported by _plotting on first use
+_plotting_modules = None
+
+
+def _plotting():
+    """Import matplotlib and seaborn on first use and set the plot style.
+    
+    Keeps the plotting stack out of the startup of --help and stats-only runs.
+    """
+    global _plotting_modules
+    if _plotting_modules is None:
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        
+        # Set style for better plots
+        plt.style.use('seaborn-v0_8')
+        sns.set_palette("husl")
+        _plotting_modules = plt, sns
+    return _plotting_modules
+
+
+def _finish_figure(path, dpi, show):
+    """Save the current figure, show it if requested, and close it"""
+    plt, _ = _plotting()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    if show:
+        plt.show()
+    plt.close()
+
+
+def _split_regions(data):
+    """Split a long measurement table into one sub-table per measured body region"""
+    return dict(tuple(data.groupby('Body Region', observed=True)))
+
+
+def plot_region_boxplot(data, body_regions, path, dpi=300, show=False):
+    """Draw a box plot comparing the body regions"""
+    plt, sns = _plotting()
+    plt.figure(figsize=(12, 8))
+    
+    measured = data['Body Region'].value_counts(sort=False)
+    order = [region for region in body_regions if measured[region] > 0]
+    
+    sns.boxplot(data=data, x='Body Region', y='Distance (mm)', order=order)
+    plt.title('Tactile Sensitivity by Body Region\n(Two-Point Discrimination Threshold)', fontsize=14, fontweight='bold')
+    plt.xlabel('Body Region', fontsize=12)
+    plt.ylabel('Distance (mm)', fontsize=12)
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    _finish_figure(path, dpi, show)
+
+
+def plot_gender_comparison(data, body_regions, path, dpi=300, show=False):
+    """Draw a grid of male/female box plots, one per body region"""
+    plt, sns = _plotting()
+    fig, axes = plt.subplots(2, 3, figsize=(15, 10))
+    axes = axes.flatten()
+    regions = _split_regions(data)
+    
+    for i, region in enumerate(body_regions):
+        if i < len(axes) and region in regions:
+            # Create gender comparison data
+            gender_df = pd.DataFrame({
+                'Gender': regions[region]['Geschlecht'].cat.rename_categories({'m': 'Male', 'w': 'Female'}),
+                'Distance (mm)': regions[region]['Distance (mm)']
+            })
+            measured = gender_df['Gender'].value_counts(sort=False)
+            order = [gender for gender in ['Male', 'Female'] if measured[gender] > 0]
+            
+            sns.boxplot(data=gender_df, x='Gender', y='Distance (mm)', order=order, ax=axes[i])
+            axes[i].set_title(f'{region}', fontweight='bold')
+            axes[i].set_xlabel('')
+    
+    # Remove empty subplot
+    if len(body_regions) < len(axes):
+        fig.delaxes(axes[-1])
+        
+    plt.suptitle('Gender Comparison of Tactile Sensitivity by Body Region', fontsize=16, fontweight='bold')
+    plt.tight_layout()
+    _finish_figure(path, dpi, show)
+
+
+def plot_correlation_heatmap(data, body_regions, path, dpi=300, show=False):
+    """Draw a heatmap of the correlations between the body regions"""
+    plt, sns = _plotting()
+    plt.figure(figsize=(10, 8))
+    
+    # Back to one column per region (and one row per participant) for the correlations
+    wide = data.pivot(index='Participant', columns='Body Region', values='Distance (mm)')
+    wide.columns = wide.columns.astype(str).rename(None)
+    correlation_data = wide.reindex(columns=body_regions).corr()
+    mask = np.triu(np.ones_like(correlation_data, dtype=bool))
+    
+    sns.heatmap(correlation_data, mask=mask, annot=True, cmap='coolwarm', center=0,
+               square=True, linewidths=0.5, cbar_kws={"shrink": .5})
+    plt.title('Correlation Between Body Regions\n(Tactile Sensitivity)', fontsize=14, fontweight='bold')
+    plt.tight_layout()
+    _finish_figure(path, dpi, show)
+
+
+def plot_distributions(data, body_regions, path, dpi=300, show=False):
+    """Draw a grid of histograms with mean and median, one per body region"""
+    plt, _ = _plotting()
+    fig, axes = plt.subplots(2, 3, figsize=(15, 10))
+    axes = axes.flatten()
+    regions = _split_regions(data)
+    
+    for i, region in enumerate(body_regions):
+        if i < len(axes) and region in regions:
+            values = regions[region]['Distance (mm)']
+            axes[i].hist(values, bins=15, alpha=0.7, edgecolor='black')
+            axes[i].axvline(values.mean(), color='red', linestyle='--', linewidth=2, label=f'Mean: {values.mean():.1f}mm')
+            axes[i].axvline(values.median(), color='orange', linestyle='--', linewidth=2, label=f'Median: {values.median():.1f}mm')
+            axes[i].set_title(f'{region}', fontweight='bold')
+            axes[i].set_xlabel('Distance (mm)')
+            axes[i].set_ylabel('Frequency')
+            axes[i].legend()
+    
+    # Remove empty subplot
+    if len(body_regions) < len(axes):
+        fig.delaxes(axes[-1])
+        
+    plt.suptitle('Distribution of Tactile Sensitivity Measurements', fontsize=16, fontweight='bold')
+    plt.tight_layout()
+    _finish_figure(path, dpi, show)
+
+
+FIGURE_FUNCTIONS = dict(zip(FIGURE_NAMES, [plot_region_boxplot, plot_gender_comparison,
+                                           plot_correlation_heatmap, plot_distributions]))
+
+
+def _render_figure(name, func, args, kwargs, profile=False, trace_memory=False):
+    """Draw one figure in a worker process, returning its profiled stage if requested"""
+    profiler = StageProfiler(enabled=profile, trace_memory=trace_memory)
+    with profiler.stage(f'figure: {name}'):
+        func(*args, **kwargs)
+    return [dict(stage, process='worker') for stage in profiler.stages]
+
+
+def _init_batch_worker():
+    """Switch a figure worker process to the non-interactive Agg backend"""
+    import matplotlib
+    matplotlib.use('Agg')
+
 
 class TactileSensitivityAnalyzer:
     """Analyzer for tactile sensitivity experimental data"""
     
-    def __init__(self, data_dir="../data", output_dir="out"):
+    def __init__(self, data_dir="../data", output_dir="out", measurements=None, profile=False, trace_memory=False,
+                 workbook=False):
         self.data_dir = Path(data_dir)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
+        # Read the sheets of WORKBOOK_FILE instead of the exported CSVs
+        self.workbook = workbook
+        
         # Body regions measured in the experiment (German -> English mapping)
-        self.body_regions_de = ['Handrücken', 'Fingerkuppe', 'Unterarm', 'Rücken', 'Handfläche']
-        self.body_regions_en = ['Hand Back', 'Fingertip', 'Forearm', 'Back', 'Palm']
+        self.body_regions_de = list(BODY_REGIONS_DE)
+        self.body_regions_en = list(BODY_REGIONS_EN)
         self.region_mapping = dict(zip(self.body_regions_de, self.body_regions_en))
         
         # Use English names throughout analysis
         self.body_regions = self.body_regions_en
         
-        # Load data
-        self.load_data()
+        # Per-stage timing and memory, saved to profile.json by run_complete_analysis
+        self.profiler = StageProfiler(enabled=profile, trace_memory=trace_memory)
         
-    def load_data(self):
-        """Load and merge participant and measurement data"""
-        print("Loading data...")
+        # Load data
+        self.load_data(measurements)
         
-        # Load participant data
-        participants = pd.read_csv(self.data_dir / "UE_Sinne_Ergebnisse-TN-Liste.csv")
+    def load_data(self, measurements=None):
+        """Load and merge participant and measurement data
         
-        # Load tactile sensitivity measurements
-        measurements = pd.read_csv(self.data_dir / "UE_Sinne_Ergebnisse-Berührung.csv")
+        `measurements` replaces the Berührung CSV, e.g. with only newly appended
+        rows, and is expected as returned by read_measurements. With
+        self.workbook both tables are read from the sheets of WORKBOOK_FILE
+        (cached by the workbook's hash, see load_cached).
+        """
+        print("Loading data...")
         
-        # Merge datasets
-        self.data = pd.merge(measurements, participants, 
-                           on=['Datum', 'Stdgang', 'Person'], 
-                           how='left')
+        with self.profiler.stage('load'):
+            workbook = self.data_dir / WORKBOOK_FILE
+            
+            # Load participant data
+            if self.workbook:
+                participants = load_cached(read_participants, workbook, CACHE_DIR, PARSER_VERSION, sheet=PARTICIPANT_SHEET)
+            else:
+                participants = read_participants(self.data_dir / "UE_Sinne_Ergebnisse-TN-Liste.csv")
+            
+            # Load tactile sensitivity measurements
+            if measurements is None and self.workbook:
+                measurements = load_cached(read_measurements, workbook, CACHE_DIR, PARSER_VERSION, sheet=MEASUREMENT_SHEET)
+            elif measurements is None:
+                measurements = read_measurements(self.data_dir / "UE_Sinne_Ergebnisse-Berührung.csv")
+            else:
+                measurements = measurements.astype({key: MEASUREMENT_DTYPES[key] for key in JOIN_KEYS})
+            
+            # Join the participant data onto the measurements
+            self.data, self.join_report = indexed_left_join(measurements, participants, JOIN_KEYS)
+            self.report_join()
         
         # Clean and preprocess data
-        self.preprocess_data()
+        with self.profiler.stage('preprocess'):
+            self.preprocess_data()
+        
+    def report_join(self):
+        """Print warnings for measurements without or with ambiguous participant entries"""
+        report = self.join_report
+        if report['unmatched']:
+            print(f"Warning: {report['unmatched']} of {report['rows']} measurement rows have no participant entry")
+        if report['duplicated_left_keys']:
+            print(f"Warning: {report['duplicated_left_keys']} measurement rows repeat the Datum/Stdgang/Person "
+                  f"of an earlier row")
+        if report['duplicated_right_keys']:
+            print(f"Warning: {report['duplicated_right_keys']} participant entries repeat the Datum/Stdgang/Person "
+                  f"of an earlier entry; {report['multiple_matches']} measurement rows match several participants")
         
     def preprocess_data(self):
         """Clean and preprocess the data"""
         print("Preprocessing data...")
         
-        # Convert comma decimal separators to dots and convert to numeric for German column names
-        for region in self.body_regions_de:
-            self.data[region] = self.data[region].astype(str).str.replace(',', '.')
-            self.data[region] = pd.to_numeric(self.data[region], errors='coerce')
-        
         # Rename German body region columns to English
         self.data = self.data.rename(columns=self.region_mapping)
         
@@ -79,214 +897,222 @@ class TactileSensitivityAnalyzer:
                                          bins=[0, 20, 25, 30, 100], 
                                          labels=['<20', '20-25', '25-30', '>30'])
         
+        # One row per measured value, used by all analyses and plots
+        self.long_data = self.build_long_table()
+        
+        # Sufficient statistics per body region, gender and cohort for all comparisons
+        self.cell_stats = cell_statistics(self.long_data, ['Body Region', 'Geschlecht', 'Stdgang'])
+        
         print(f"Data loaded: {len(self.data)} participants")
         print(f"Gender distribution: {self.data['Geschlecht'].value_counts().to_dict()}")
         
-    def descriptive_statistics(self):
-        """Calculate descriptive statistics for each body region"""
+    def build_long_table(self):
+        """Reshape the body region columns into a long-format measurement table
+        
+        Every measured value becomes one row with the participant (row position
+        in self.data), body region, gender, age group, cohort (Stdgang) and
+        distance. The keys are categoricals; missing measurements are left out.
+        """
+        values = self.data[self.body_regions].to_numpy(dtype=float)
+        n_participants, n_regions = values.shape
+        
+        # Region-major order: all values of the first region, then the second, ...
+        distance = values.ravel(order='F')
+        measured = ~np.isnan(distance)
+        participant = np.tile(np.arange(n_participants), n_regions)[measured]
+        region_codes = np.repeat(np.arange(n_regions), n_participants)[measured]
+        
+        gender = pd.Categorical(self.data['Geschlecht'], categories=['m', 'w'])
+        age_group = pd.Categorical(self.data['Altersgruppe'])
+        cohort = pd.Categorical(self.data['Stdgang'])
+        
+        return pd.DataFrame({
+            'Participant': participant,
+            'Body Region': pd.Categorical.from_codes(region_codes, categories=self.body_regions),
+            'Geschlecht': pd.Categorical.from_codes(gender.codes[participant], categories=gender.categories),
+            'Altersgruppe': pd.Categorical.from_codes(age_group.codes[participant], categories=age_group.categories,
+                                                      ordered=age_group.ordered),
+            'Stdgang': pd.Categorical.from_codes(cohort.codes[participant], categories=cohort.categories),
+            'Distance (mm)': distance[measured],
+        })
+        
+    def region_matrix(self):
+        """Distances as a participants x body regions array (NaN where not measured)"""
+        matrix = np.full((len(self.data), len(self.body_regions)), np.nan)
+        matrix[self.long_data['Participant'].to_numpy(),
+               self.long_data['Body Region'].cat.codes.to_numpy()] = self.long_data['Distance (mm)'].to_numpy()
+        return matrix
+        
+    def grouped_distances(self, keys):
+        """Split the distances of the long table by `keys` into a dict of Series"""
+        return dict(tuple(self.long_data.groupby(keys, observed=True)['Distance (mm)']))
+        
+    def descriptive_statistics(self, percentiles=(0.25, 0.75), by=None):
+        """Calculate descriptive statistics for each body region
+        
+        `percentiles` are fractions, e.g. (0.05, 0.95). With `by` (e.g.
+        ['Geschlecht'] or ['Geschlecht', 'Altersgruppe']) the statistics are also
+        split by these groups and saved to descriptive_statistics_by_<keys>.csv.
+        """
         print("\nCalculating descriptive statistics...")
         
-        stats_dict = {}
-        
-        for region in self.body_regions:
-            region_data = self.data[region].dropna()
-            
-            if len(region_data) > 0:
-                stats_dict[region] = {
-                    'n': len(region_data),
-                    'mean': region_data.mean(),
-                    'median': region_data.median(),
-                    'std': region_data.std(),
-                    'min': region_data.min(),
-                    'max': region_data.max(),
-                    'q25': region_data.quantile(0.25),
-                    'q75': region_data.quantile(0.75)
-                }
-        
-        # Create descriptive statistics DataFrame
-        self.desc_stats = pd.DataFrame(stats_dict).T
+        self.desc_stats = describe_distances(self.long_data, percentiles=percentiles).rename_axis(None)
         
         # Save to CSV
         self.desc_stats.to_csv(self.output_dir / "descriptive_statistics.csv")
-        
         print("Descriptive statistics saved to descriptive_statistics.csv")
-        return self.desc_stats
         
-    def compare_body_regions(self):
-        """Compare tactile sensitivity between body regions using t-tests"""
-        print("\nComparing body regions with t-tests...")
+        if by:
+            filename = f"descriptive_statistics_by_{'_'.join(by).lower()}.csv"
+            self.group_desc_stats = describe_distances(self.long_data, keys=['Body Region'] + list(by),
+                                                       percentiles=percentiles)
+            self.group_desc_stats.to_csv(self.output_dir / filename)
+            print(f"Descriptive statistics by {', '.join(by)} saved to {filename}")
+        return self.desc_stats
         
-        # Prepare data for analysis
-        region_data = []
-        for region in self.body_regions:
-            values = self.data[region].dropna()
-            region_data.append(values)
+    def compare_body_regions(self, welch=False):
+        """Compare tactile sensitivity between body regions using t-tests
         
-        # Perform pairwise t-tests
-        results = []
+        All pairs are tested at once from the pooled sufficient statistics of
+        each region; with `welch` the t-statistic and p-value are those of
+        Welch's t-test. Since every participant is measured on all regions,
+        paired t-tests are saved to paired_region_comparisons.csv as well.
+        """
+        print("\nComparing body regions with t-tests...")
         
-        for i in range(len(self.body_regions)):
-            for j in range(i+1, len(self.body_regions)):
-                region1 = self.body_regions[i]
-                region2 = self.body_regions[j]
-                
-                data1 = region_data[i]
-                data2 = region_data[j]
-                
-                if len(data1) > 0 and len(data2) > 0:
-                    # Perform independent t-test
-                    t_stat, p_value = stats.ttest_ind(data1, data2)
-                    
-                    # Cohen's d for effect size
-                    pooled_std = np.sqrt(((len(data1)-1)*data1.var() + (len(data2)-1)*data2.var()) / (len(data1)+len(data2)-2))
-                    cohens_d = (data1.mean() - data2.mean()) / pooled_std
-                    
-                    results.append({
-                        'Region 1': region1,
-                        'Region 2': region2,
-                        'Mean 1': data1.mean(),
-                        'Mean 2': data2.mean(),
-                        't-statistic': t_stat,
-                        'p-value': p_value,
-                        'Cohen\'s d': cohens_d,
-                        'Significant': p_value < 0.05
-                    })
-        
-        self.region_comparisons = pd.DataFrame(results)
+        # Pool the cells over gender and cohort
+        region_stats = merge_statistics(self.cell_stats, 'Body Region')
+        i, j = np.triu_indices(len(region_stats), k=1)
+        first, second = region_stats.iloc[i], region_stats.iloc[j]
+        tests = two_sample_tests(first['n'].to_numpy(), first['mean'].to_numpy(), first['m2'].to_numpy(),
+                                 second['n'].to_numpy(), second['mean'].to_numpy(), second['m2'].to_numpy())
+        t_stat, p_value = (tests['t_welch'], tests['p_welch']) if welch else (tests['t'], tests['p'])
+        
+        self.region_comparisons = pd.DataFrame({
+            'Region 1': first.index.astype(str),
+            'Region 2': second.index.astype(str),
+            'Mean 1': first['mean'].to_numpy(),
+            'Mean 2': second['mean'].to_numpy(),
+            't-statistic': t_stat,
+            'p-value': p_value,
+            'Cohen\'s d': tests['cohens_d'],
+            'Significant': p_value < 0.05
+        })
         self.region_comparisons.to_csv(self.output_dir / "region_comparisons.csv", index=False)
         
-        print("Region comparisons saved to region_comparisons.csv")
+        # Paired t-tests over the participants measured on both regions
+        i, j, paired = paired_tests(self.region_matrix())
+        regions = np.array(self.body_regions)
+        self.paired_region_comparisons = pd.DataFrame({
+            'Region 1': regions[i],
+            'Region 2': regions[j],
+            'N': paired['n'].astype(int),
+            'Mean Difference': paired['mean_diff'],
+            't-statistic': paired['t'],
+            'p-value': paired['p'],
+            'Cohen\'s d': paired['cohens_d'],
+            'Significant': paired['p'] < 0.05
+        })[paired['n'] > 1]
+        self.paired_region_comparisons.to_csv(self.output_dir / "paired_region_comparisons.csv", index=False)
+        
+        print("Region comparisons saved to region_comparisons.csv and paired_region_comparisons.csv")
         return self.region_comparisons
         
-    def compare_genders(self):
-        """Compare tactile sensitivity between genders"""
+    def compare_genders(self, welch=False, permutations=0, seed=0, precision=None, workers=1):
+        """Compare tactile sensitivity between genders
+        
+        Uses the sufficient statistics per region and gender, pooled over the
+        cohorts; with `welch` Welch's t-test replaces Student's. With
+        `permutations` > 0 a permutation test of the mean difference is added
+        (see permutation_test), since the thresholds are skewed and integer-valued.
+        """
         print("\nComparing genders...")
         
-        results = []
+        gender_stats = merge_statistics(self.cell_stats, ['Body Region', 'Geschlecht']).unstack('Geschlecht')
+        gender_stats = gender_stats.reindex(columns=pd.MultiIndex.from_product([['n', 'mean', 'm2'], ['m', 'w']]))
+        gender_stats = gender_stats[(gender_stats[('n', 'm')] > 1) & (gender_stats[('n', 'w')] > 1)]
+        male, female = gender_stats.xs('m', axis=1, level=1), gender_stats.xs('w', axis=1, level=1)
+        tests = two_sample_tests(male['n'].to_numpy(), male['mean'].to_numpy(), male['m2'].to_numpy(),
+                                 female['n'].to_numpy(), female['mean'].to_numpy(), female['m2'].to_numpy())
+        t_stat, p_value = (tests['t_welch'], tests['p_welch']) if welch else (tests['t'], tests['p'])
+        
+        self.gender_comparisons = pd.DataFrame({
+            'Body Region': gender_stats.index.astype(str),
+            'Male Mean': male['mean'].to_numpy(),
+            'Female Mean': female['mean'].to_numpy(),
+            'Male N': male['n'].to_numpy(dtype=int),
+            'Female N': female['n'].to_numpy(dtype=int),
+            't-statistic': t_stat,
+            'p-value': p_value,
+            'Cohen\'s d': tests['cohens_d'],
+            'Significant': p_value < 0.05
+        })
+        
+        if permutations > 0:
+            is_male = (self.data['Geschlecht'] == 'm').to_numpy()
+            p_values, _, used = permutation_test(self.region_matrix(), is_male, n_permutations=permutations,
+                                                 seed=seed, workers=workers, precision=precision)
+            regions = [self.body_regions.index(region) for region in self.gender_comparisons['Body Region']]
+            self.gender_comparisons['Permutation p-value'] = p_values[regions]
+            self.gender_comparisons['Permutations'] = used
+            print(f"Permutation test with {used:,} permutations")
         
-        for region in self.body_regions:
-            male_data = self.data[self.data['Geschlecht'] == 'm'][region].dropna()
-            female_data = self.data[self.data['Geschlecht'] == 'w'][region].dropna()
-            
-            if len(male_data) > 1 and len(female_data) > 1:
-                # Perform independent t-test
-                t_stat, p_value = stats.ttest_ind(male_data, female_data)
-                
-                # Cohen's d for effect size
-                pooled_std = np.sqrt(((len(male_data)-1)*male_data.var() + (len(female_data)-1)*female_data.var()) / (len(male_data)+len(female_data)-2))
-                cohens_d = (male_data.mean() - female_data.mean()) / pooled_std
-                
-                results.append({
-                    'Body Region': region,
-                    'Male Mean': male_data.mean(),
-                    'Female Mean': female_data.mean(),
-                    'Male N': len(male_data),
-                    'Female N': len(female_data),
-                    't-statistic': t_stat,
-                    'p-value': p_value,
-                    'Cohen\'s d': cohens_d,
-                    'Significant': p_value < 0.05
-                })
-        
-        self.gender_comparisons = pd.DataFrame(results)
         self.gender_comparisons.to_csv(self.output_dir / "gender_comparisons.csv", index=False)
         
         print("Gender comparisons saved to gender_comparisons.csv")
         return self.gender_comparisons
         
-    def create_visualizations(self):
-        """Create comprehensive visualizations"""
-        print("\nCreating visualizations...")
+    def correlations(self, n_bootstrap=1000, seed=0, confidence=0.95):
+        """Pearson and Spearman correlations between the body regions
         
-        # 1. Box plot comparing body regions
-        plt.figure(figsize=(12, 8))
+        Computed on the participants measured on both regions of each pair, with
+        percentile bootstrap intervals from `n_bootstrap` resamples (0 skips
+        them); see correlation_table.
+        """
+        print("\nCalculating correlations between body regions...")
         
-        # Prepare data for plotting
-        plot_data = []
-        for region in self.body_regions:
-            values = self.data[region].dropna()
-            for value in values:
-                plot_data.append({'Body Region': region, 'Distance (mm)': value})
-        
-        plot_df = pd.DataFrame(plot_data)
-        
-        sns.boxplot(data=plot_df, x='Body Region', y='Distance (mm)')
-        plt.title('Tactile Sensitivity by Body Region\n(Two-Point Discrimination Threshold)', fontsize=14, fontweight='bold')
-        plt.xlabel('Body Region', fontsize=12)
-        plt.ylabel('Distance (mm)', fontsize=12)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig(self.output_dir / "body_regions_boxplot.png", dpi=300, bbox_inches='tight')
-        plt.show()
+        self.correlation_results = correlation_table(self.region_matrix(), self.body_regions,
+                                                     n_bootstrap=n_bootstrap, seed=seed, confidence=confidence)
+        self.correlation_results.to_csv(self.output_dir / "correlations.csv", index=False)
         
-        # 2. Gender comparison plots
-        fig, axes = plt.subplots(2, 3, figsize=(15, 10))
-        axes = axes.flatten()
-        
-        for i, region in enumerate(self.body_regions):
-            if i < len(axes):
-                male_data = self.data[self.data['Geschlecht'] == 'm'][region].dropna()
-                female_data = self.data[self.data['Geschlecht'] == 'w'][region].dropna()
-                
-                # Create gender comparison data
-                gender_data = []
-                for value in male_data:
-                    gender_data.append({'Gender': 'Male', 'Distance (mm)': value})
-                for value in female_data:
-                    gender_data.append({'Gender': 'Female', 'Distance (mm)': value})
-                
-                if gender_data:
-                    gender_df = pd.DataFrame(gender_data)
-                    sns.boxplot(data=gender_df, x='Gender', y='Distance (mm)', ax=axes[i])
-                    axes[i].set_title(f'{region}', fontweight='bold')
-                    axes[i].set_xlabel('')
-        
-        # Remove empty subplot
-        if len(self.body_regions) < len(axes):
-            fig.delaxes(axes[-1])
-            
-        plt.suptitle('Gender Comparison of Tactile Sensitivity by Body Region', fontsize=16, fontweight='bold')
-        plt.tight_layout()
-        plt.savefig(self.output_dir / "gender_comparison.png", dpi=300, bbox_inches='tight')
-        plt.show()
+        print("Correlations saved to correlations.csv")
+        return self.correlation_results
         
-        # 3. Correlation heatmap between body regions
-        plt.figure(figsize=(10, 8))
+    def create_visualizations(self, batch=False, workers=1, fmt='png', resolution='print'):
+        """Create comprehensive visualizations
         
-        correlation_data = self.data[self.body_regions].corr()
-        mask = np.triu(np.ones_like(correlation_data, dtype=bool))
+        In batch mode the non-interactive Agg backend is used, figures are never
+        shown, and the four figures are rendered concurrently in `workers`
+        processes (0 uses all CPU cores). `fmt` selects the file format and
+        `resolution` one of RESOLUTION_PRESETS.
+        """
+        print("\nCreating visualizations...")
         
-        sns.heatmap(correlation_data, mask=mask, annot=True, cmap='coolwarm', center=0,
-                   square=True, linewidths=0.5, cbar_kws={"shrink": .5})
-        plt.title('Correlation Between Body Regions\n(Tactile Sensitivity)', fontsize=14, fontweight='bold')
-        plt.tight_layout()
-        plt.savefig(self.output_dir / "correlation_heatmap.png", dpi=300, bbox_inches='tight')
-        plt.show()
-        
-        # 4. Distribution plots
-        fig, axes = plt.subplots(2, 3, figsize=(15, 10))
-        axes = axes.flatten()
-        
-        for i, region in enumerate(self.body_regions):
-            if i < len(axes):
-                data = self.data[region].dropna()
-                if len(data) > 0:
-                    axes[i].hist(data, bins=15, alpha=0.7, edgecolor='black')
-                    axes[i].axvline(data.mean(), color='red', linestyle='--', linewidth=2, label=f'Mean: {data.mean():.1f}mm')
-                    axes[i].axvline(data.median(), color='orange', linestyle='--', linewidth=2, label=f'Median: {data.median():.1f}mm')
-                    axes[i].set_title(f'{region}', fontweight='bold')
-                    axes[i].set_xlabel('Distance (mm)')
-                    axes[i].set_ylabel('Frequency')
-                    axes[i].legend()
-        
-        # Remove empty subplot
-        if len(self.body_regions) < len(axes):
-            fig.delaxes(axes[-1])
-            
-        plt.suptitle('Distribution of Tactile Sensitivity Measurements', fontsize=16, fontweight='bold')
-        plt.tight_layout()
-        plt.savefig(self.output_dir / "distributions.png", dpi=300, bbox_inches='tight')
-        plt.show()
+        dpi = RESOLUTION_PRESETS[resolution]
+        data = self.long_data
+        jobs = [(name, FIGURE_FUNCTIONS[name], self.output_dir / f"{name}.{fmt}") for name in FIGURE_NAMES]
+        
+        if not batch:
+            for name, func, path in jobs:
+                with self.profiler.stage(f'figure: {name}'):
+                    func(data, self.body_regions, path, dpi=dpi, show=True)
+            return
+        
+        _init_batch_worker()
+        if workers == 1:
+            for name, func, path in jobs:
+                with self.profiler.stage(f'figure: {name}'):
+                    func(data, self.body_regions, path, dpi=dpi)
+            return
+        
+        # Figures rendered in the workers are profiled there; the pool as a whole here
+        profile = dict(profile=self.profiler.enabled, trace_memory=self.profiler.trace_memory)
+        with self.profiler.stage('figures'), \
+                ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_batch_worker) as pool:
+            futures = [pool.submit(_render_figure, name, func, (data, self.body_regions, path), {'dpi': dpi}, **profile)
+                       for name, func, path in jobs]
+            worker_stages = [stage for future in futures for stage in future.result()]
+        self.profiler.stages += worker_stages
         
     def generate_report(self):
         """Generate a comprehensive text report"""
@@ -379,28 +1205,247 @@ class TactileSensitivityAnalyzer:
         print("Analysis report saved to analysis_report.txt")
         return report_text
         
-    def run_complete_analysis(self):
-        """Run the complete analysis pipeline"""
+    def save_bundle(self, files, describe_by=None, **parameters):
+        """Save all results of this run in one file, BUNDLE_FILE in the output directory
+        
+        The bundle holds the statistics tables computed so far (kind 'table'),
+        the cleaned participant data ('data'), the given output `files` such
+        as figures and the report ('file') and the run metadata with the
+        analysis `parameters`; see read_bundle. Returns False if pyarrow is
+        not installed.
+        """
+        tables = [('descriptive_statistics', 'desc_stats'), ('region_comparisons', 'region_comparisons'),
+                  ('paired_region_comparisons', 'paired_region_comparisons'),
+                  ('gender_comparisons', 'gender_comparisons'), ('correlations', 'correlation_results')]
+        if describe_by:
+            tables.append((f"descriptive_statistics_by_{'_'.join(describe_by).lower()}", 'group_desc_stats'))
+        entries = [(name, 'table', getattr(self, attr)) for name, attr in tables if hasattr(self, attr)]
+        entries.append(('data', 'data', self.data))
+        entries += [(name, 'file', self.output_dir / name) for name in files]
+        
+        metadata = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'script': 'tactile_sensitivity_analysis.py',
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'data_dir': str(self.data_dir),
+            'workbook': self.workbook,
+            'participants': len(self.data),
+            'measurements': len(self.long_data),
+            'join': self.join_report,
+            'parameters': {'describe_by': describe_by, **parameters}
+        }
+        try:
+            write_bundle(self.output_dir / BUNDLE_FILE, entries, metadata)
+        except ImportError:
+            print("No Parquet engine installed (pyarrow), skipping the results bundle.")
+            return False
+        print(f"Results bundle saved to {BUNDLE_FILE}")
+        return True
+        
+    def run_complete_analysis(self, batch=False, workers=1, fmt='png', resolution='print', welch=False,
+                              permutations=0, seed=0, precision=None, plots=True, only=None,
+                              percentiles=(0.25, 0.75), describe_by=None, bootstrap=1000, bootstrap_seed=0,
+                              bundle=False):
+        """Run the complete analysis pipeline
+        
+        `percentiles` and `describe_by` are passed on to descriptive_statistics,
+        `bootstrap` and `bootstrap_seed` to correlations, the figure options to
+        create_visualizations, `welch` to the region and
+        gender comparisons and the permutation test options (and `workers`) to
+        compare_genders. `plots=False` skips the figures
+        (and with them the plotting imports); `only` runs just the 'stats'
+        (the statistics CSVs) or just the 'plots'. `bundle` additionally
+        collects all results in BUNDLE_FILE (see save_bundle).
+        """
         print("Starting complete tactile sensitivity analysis...")
         print("=" * 50)
         
+        run_stats = only in (None, 'stats')
+        run_plots = plots and only in (None, 'plots')
+        outputs = []
+        
         # Run all analyses
-        self.descriptive_statistics()
-        self.compare_body_regions()
-        self.compare_genders()
-        self.create_visualizations()
-        self.generate_report()
+        if run_stats:
+            with self.profiler.stage('descriptive statistics'):
+                self.descriptive_statistics(percentiles=percentiles, by=describe_by)
+            with self.profiler.stage('region comparisons'):
+                self.compare_body_regions(welch=welch)
+            with self.profiler.stage('gender comparisons'):
+                self.compare_genders(welch=welch, permutations=permutations, seed=seed, precision=precision,
+                                     workers=workers)
+            with self.profiler.stage('correlations'):
+                self.correlations(n_bootstrap=bootstrap, seed=bootstrap_seed)
+            outputs += ["descriptive_statistics.csv", "region_comparisons.csv",
+                        "paired_region_comparisons.csv", "gender_comparisons.csv", "correlations.csv"]
+            if describe_by:
+                outputs.append(f"descriptive_statistics_by_{'_'.join(describe_by).lower()}.csv")
+        if run_plots:
+            self.create_visualizations(batch=batch, workers=workers, fmt=fmt, resolution=resolution)
+            outputs += [f"{name}.{fmt}" for name in FIGURE_NAMES]
+        if only is None:
+            with self.profiler.stage('report'):
+                self.generate_report()
+            outputs.append("analysis_report.txt")
+        
+        if self.profiler.enabled:
+            self.profiler.save(self.output_dir / "profile.json", script='tactile_sensitivity_analysis.py',
+                               data_dir=str(self.data_dir), participants=len(self.data),
+                               measurements=len(self.long_data), batch=batch, workers=workers)
+            outputs.append("profile.json")
+        
+        if bundle and self.save_bundle([output for output in outputs if not output.endswith('.csv')],
+                                       describe_by=describe_by, only=only, percentiles=percentiles,
+                                       welch=welch, permutations=permutations, permutation_seed=seed,
+                                       permutation_precision=precision, bootstrap=bootstrap,
+                                       bootstrap_seed=bootstrap_seed, format=fmt, resolution=resolution):
+            outputs.append(BUNDLE_FILE)
         
         print("\n" + "=" * 50)
-        print("Analysis complete! Results saved to 'out' directory:")
-        print("- descriptive_statistics.csv")
-        print("- region_comparisons.csv")
-        print("- gender_comparisons.csv")
-        print("- body_regions_boxplot.png")
-        print("- gender_comparison.png")
-        print("- correlation_heatmap.png")
-        print("- distributions.png")
-        print("- analysis_report.txt")
+        print(f"Analysis complete! Results saved to '{self.output_dir}' directory:")
+        for output in outputs:
+            print(f"- {output}")
+
+def run_dataset(data_dir, output_dir, profile=False, trace_memory=False, workbook=False, **options):
+    """Run the complete analysis for one dataset in batch mode
+    
+    Meant for the worker processes of run_datasets: the console output of the
+    analysis is captured, and the status, timing and captured output are
+    returned instead of raised. `profile` and `trace_memory` set up the
+    analyzer's profiler, `workbook` selects the workbook as input, `options`
+    are passed on to run_complete_analysis.
+    """
+    start = time.perf_counter()
+    log = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(log):
+            analyzer = TactileSensitivityAnalyzer(data_dir=data_dir, output_dir=output_dir,
+                                                  profile=profile, trace_memory=trace_memory, workbook=workbook)
+            analyzer.run_complete_analysis(batch=True, workers=1, **options)
+        status, participants = 'ok', len(analyzer.data)
+    except Exception as e:
+        print(f"{type(e).__name__}: {e}", file=log)
+        status, participants = 'failed', 0
+    return {
+        'Dataset': str(data_dir),
+        'Output': str(output_dir),
+        'Status': status,
+        'Participants': participants,
+        'Seconds': time.perf_counter() - start,
+        'Log': log.getvalue()
+    }
+
+
+def update_descriptive_statistics(data_dir="../data", output_dir="out"):
+    """Update descriptive_statistics.csv with only the rows appended since the last update
+    
+    The OnlineStatistics state is kept in STATE_FILE in the output directory,
+    together with the byte offset up to which the Berührung CSV has been
+    absorbed and a fingerprint of the header and the last FINGERPRINT_BYTES
+    before it. If the fingerprint still matches, only the bytes after the
+    offset are parsed; otherwise (or without a state) all rows are absorbed.
+    Edits of older rows outside the fingerprint are not noticed; delete the
+    state file to rebuild after such a correction.
+    """
+    data_dir, output_dir = Path(data_dir), Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    source = data_dir / "UE_Sinne_Ergebnisse-Berührung.csv"
+    state_path = output_dir / STATE_FILE
+    
+    def fingerprint(f, header, offset):
+        f.seek(max(len(header), offset - FINGERPRINT_BYTES))
+        return hashlib.sha256(header + f.read(offset - f.tell())).hexdigest()
+    
+    with open(source, 'rb') as f:
+        header = f.readline()
+        size = os.path.getsize(source)
+        online, offset = OnlineStatistics(), len(header)
+        
+        if state_path.exists():
+            with open(state_path, 'r', encoding='utf-8') as state_file:
+                saved = json.load(state_file)
+            if saved['offset'] <= size and fingerprint(f, header, saved['offset']) == saved['fingerprint']:
+                online, offset = OnlineStatistics.from_dict(saved['statistics']), saved['offset']
+            else:
+                print(f"{source.name} changed before the last absorbed row, rebuilding the statistics")
+        
+        f.seek(offset)
+        new_rows = f.read(size - offset)
+        new_fingerprint = fingerprint(f, header, size)
+    
+    print(f"Absorbing {size - offset:,} new bytes of {source.name}")
+    if new_rows.strip():
+        measurements = read_measurements(io.BytesIO(header + new_rows))
+        analyzer = TactileSensitivityAnalyzer(data_dir=data_dir, output_dir=output_dir, measurements=measurements)
+        online.update(analyzer.long_data)
+    
+    desc_stats = online.descriptive_table(BODY_REGIONS_EN)
+    desc_stats.to_csv(output_dir / "descriptive_statistics.csv")
+    with open(state_path, 'w', encoding='utf-8') as state_file:
+        json.dump({'source': str(source), 'offset': size, 'fingerprint': new_fingerprint,
+                   'statistics': online.to_dict()}, state_file)
+    
+    print(f"Descriptive statistics saved to {output_dir / 'descriptive_statistics.csv'}")
+    return desc_stats
+
+
+def merge_statistics_states(state_paths, output_dir="out"):
+    """Merge the update_descriptive_statistics states of separate datasets (e.g. cohorts)
+    
+    Writes the pooled descriptive_statistics.csv to `output_dir` without touching
+    any raw data.
+    """
+    online = None
+    for path in state_paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = OnlineStatistics.from_dict(json.load(f)['statistics'])
+        online = state if online is None else online.merge(state)
+    
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    desc_stats = online.descriptive_table(BODY_REGIONS_EN)
+    desc_stats.to_csv(output_dir / "descriptive_statistics.csv")
+    print(f"Merged {len(state_paths)} states into {output_dir / 'descriptive_statistics.csv'}")
+    return desc_stats
+
+
+def load_run_manifest(path):
+    """Load dataset/output pairs from a JSON manifest
+    
+    The manifest is a list of {"data_dir": ..., "output_dir": ...} objects;
+    relative paths are taken relative to the manifest file.
+    """
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    return [(path.parent / entry['data_dir'], path.parent / entry['output_dir']) for entry in entries]
+
+
+def run_datasets(runs, jobs=0, **options):
+    """Analyze many (data_dir, output_dir) pairs concurrently in a process pool
+    
+    Every worker process pays the imports once and then handles one dataset
+    after the other. `jobs` is the number of worker processes (0 for all CPU
+    cores), `options` are passed on to run_dataset. Returns a
+    summary DataFrame with status and timing per dataset.
+    """
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=min(jobs or os.cpu_count(), len(runs)),
+                             initializer=_init_batch_worker) as pool:
+        futures = [pool.submit(run_dataset, data_dir, output_dir, **options) for data_dir, output_dir in runs]
+        results = []
+        for future in futures:
+            result = future.result()
+            print(f"{result['Dataset']}: {result['Status']} ({result['Seconds']:.1f}s)")
+            if result['Status'] != 'ok':
+                print(result['Log'])
+            results.append(result)
+    
+    summary = pd.DataFrame(results).drop(columns='Log')
+    print(f"\nAnalyzed {len(runs)} datasets in {time.perf_counter() - start:.1f}s:")
+    print(summary.to_string(index=False, float_format='{:.1f}'.format))
+    return summary
+
 
 def main():
     """Main function to run the analysis"""
@@ -414,15 +1459,90 @@ def main():
     parser.add_argument('--output-dir', type=str, 
                       default=TactileSensitivityAnalyzer.__init__.__defaults__[1], 
                       help='Directory for output files (default: %(default)s)')
+    parser.add_argument('--run', nargs=2, action='append', metavar=('DATA_DIR', 'OUTPUT_DIR'),
+                      help='Dataset and output directory to analyze in batch mode; repeat to run several datasets concurrently')
+    parser.add_argument('--manifest', type=str,
+                      help='JSON file listing {"data_dir": ..., "output_dir": ...} pairs to analyze concurrently')
+    parser.add_argument('--jobs', type=int, default=0,
+                      help='Number of processes for --run/--manifest datasets, 0 for all CPU cores (default: %(default)s)')
+    parser.add_argument('--workbook', action='store_true',
+                      help=f"Read the '{PARTICIPANT_SHEET}' and '{MEASUREMENT_SHEET}' sheets straight from {WORKBOOK_FILE} in the data directory instead of the exported CSVs")
+    parser.add_argument('--incremental', action='store_true',
+                      help='Only update descriptive_statistics.csv with the rows appended since the last --incremental run')
+    parser.add_argument('--merge-states', nargs='+', metavar='STATE',
+                      help=f'Merge {STATE_FILE} files of separate datasets into descriptive_statistics.csv in the output directory')
+    parser.add_argument('--percentiles', type=float, nargs='+', default=[25, 75], metavar='PERCENT',
+                      help='Percentiles for the descriptive statistics (default: %(default)s)')
+    parser.add_argument('--describe-by', nargs='+', choices=['Geschlecht', 'Altersgruppe'],
+                      help='Also write the descriptive statistics split by gender and/or age group')
+    parser.add_argument('--bootstrap', type=int, default=1000,
+                      help='Bootstrap resamples for the confidence intervals in correlations.csv, 0 to skip them (default: %(default)s)')
+    parser.add_argument('--bootstrap-seed', type=int, default=0,
+                      help='Random seed for the bootstrap (default: %(default)s)')
+    parser.add_argument('--welch', action='store_true',
+                      help="Use Welch's t-test (unequal variances) for the region and gender comparisons")
+    parser.add_argument('--permutations', type=int, default=0,
+                      help='Add a permutation test with this many label permutations to the gender comparisons (default: %(default)s)')
+    parser.add_argument('--permutation-seed', type=int, default=0,
+                      help='Random seed for the permutation test (default: %(default)s)')
+    parser.add_argument('--permutation-precision', type=float,
+                      help='Stop the permutation test once every p-value is known to +/- this value (95%% confidence)')
+    parser.add_argument('--no-plots', action='store_true',
+                      help='Skip the figures (the plotting libraries are then never imported)')
+    parser.add_argument('--only', choices=['stats', 'plots'],
+                      help='Only write the statistics CSVs or only the figures')
+    parser.add_argument('--bundle', action='store_true',
+                      help=f'Also collect all tables, the cleaned data, the figures, the report and the run metadata in {BUNDLE_FILE} (needs pyarrow)')
+    parser.add_argument('--profile', action='store_true',
+                      help='Record wall time, CPU time and peak memory per stage in profile.json in the output directory')
+    parser.add_argument('--profile-memory', action='store_true',
+                      help='Like --profile, and trace the peak allocations of every stage (slows the run down)')
+    parser.add_argument('--batch', action='store_true',
+                      help='Headless mode: never show figures and render them in parallel')
+    parser.add_argument('--workers', type=int,
+                      help='Number of processes for rendering figures in batch mode and for the permutation test, 0 for all CPU cores (default: one per figure with --batch, otherwise 1)')
+    parser.add_argument('--format', choices=FIGURE_FORMATS, default='png',
+                      help='File format of the figures (default: %(default)s)')
+    parser.add_argument('--resolution', choices=list(RESOLUTION_PRESETS), default='print',
+                      help='Resolution preset of the figures (default: %(default)s)')
     
     # Parse arguments
     args = parser.parse_args()
     
+    # Incremental statistics without reprocessing all rows
+    if args.merge_states:
+        merge_statistics_states(args.merge_states, output_dir=args.output_dir)
+        return
+    if args.incremental:
+        update_descriptive_statistics(data_dir=args.data_dir, output_dir=args.output_dir)
+        return
+    
+    # Input, profiling and analysis options shared by single and multi-dataset runs
+    setup = dict(profile=args.profile or args.profile_memory, trace_memory=args.profile_memory,
+                 workbook=args.workbook)
+    options = dict(fmt=args.format, resolution=args.resolution, welch=args.welch, permutations=args.permutations,
+                   seed=args.permutation_seed, precision=args.permutation_precision, plots=not args.no_plots,
+                   only=args.only, percentiles=[percent / 100 for percent in args.percentiles],
+                   describe_by=args.describe_by, bootstrap=args.bootstrap, bootstrap_seed=args.bootstrap_seed,
+                   bundle=args.bundle)
+    
+    # Several datasets: run them in a process pool and print a summary
+    runs = [(Path(data_dir), Path(output_dir)) for data_dir, output_dir in args.run or []]
+    if args.manifest:
+        runs += load_run_manifest(args.manifest)
+    if runs:
+        summary = run_datasets(runs, jobs=args.jobs, **setup, **options)
+        if (summary['Status'] != 'ok').any():
+            raise SystemExit(1)
+        return
+    
     # Create analyzer instance with specified directories
-    analyzer = TactileSensitivityAnalyzer(data_dir=args.data_dir, output_dir=args.output_dir)
+    analyzer = TactileSensitivityAnalyzer(data_dir=args.data_dir, output_dir=args.output_dir, **setup)
     
     # Run complete analysis
-    analyzer.run_complete_analysis()
+    # Without --batch the figures are shown one by one, so only parallelize on request
+    workers = args.workers if args.workers is not None else len(FIGURE_NAMES) if args.batch else 1
+    analyzer.run_complete_analysis(batch=args.batch, workers=workers, **options)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file